@@ -1,10 +1,27 @@
+import re
 import sys
 import math
+import time
+import functools
+from array import array
+
+# Decimal digits per limb for the vectorized big-number addition; two limbs add up to less than 2**64
+LIMB_DIGITS = 18
+LIMB_BASE = 10 ** LIMB_DIGITS
+
+# A line of a batch input: two numbers separated by whitespace or a comma
+PAIR_PATTERN = re.compile(r'^[ \t]*([^\s,]+)(?:[ \t]*,[ \t]*|[ \t]+)([^\s,]+)[ \t]*\r?$')
+# Whitespace that NumPy's text parser splits on but PAIR_PATTERN does not accept
+EXTRA_WHITESPACE_PATTERN = re.compile(r'[^\S \t\r\n]|\r(?!\n|\Z)')
+# Lines per chunk when streaming pairs
+BATCH_CHUNK_SIZE = 65536
 
 class ListNode:
     """
     Node of a singly linked list representing a single digit.
     """
+    __slots__ = ('val', 'next')
+
     def __init__(self, val=0, next=None):
         self.val = val
         self.next = next
@@ -78,6 +95,154 @@ def linked_to_list(node):
         node = node.next
     return result
 
+@functools.lru_cache(maxsize=None)
+def _limb_powers():
+    """
+    Powers of ten within a limb (10**0 to 10**17) as uint64, built on first use.
+    """
+    import numpy as np
+    return 10 ** np.arange(LIMB_DIGITS, dtype=np.uint64)
+
+def digits_to_limbs(digits):
+    """
+    Pack decimal digits into base-10**18 limbs.
+
+    Args:
+        digits (list[int] or numpy.ndarray): Digits, least significant digit first.
+    Returns:
+        numpy.ndarray: uint64 limbs, least significant limb first (at least one limb).
+    Raises:
+        ValueError: If a digit is not between 0 and 9.
+    """
+    import numpy as np
+    digits = np.asarray(digits, dtype=np.int64).ravel()
+    if digits.size and (digits.min() < 0 or digits.max() > 9):
+        raise ValueError("Digits must be between 0 and 9")
+    padded = np.zeros(max(1, -(-digits.size // LIMB_DIGITS)) * LIMB_DIGITS, dtype=np.uint64)
+    padded[:digits.size] = digits
+    return padded.reshape(-1, LIMB_DIGITS) @ _limb_powers()
+
+def limbs_to_digits(limbs):
+    """
+    Unpack base-10**18 limbs into decimal digits without leading zeros.
+
+    Args:
+        limbs (numpy.ndarray): uint64 limbs, least significant limb first.
+    Returns:
+        numpy.ndarray: Digits, least significant digit first (at least one digit).
+    """
+    import numpy as np
+    limbs = np.asarray(limbs, dtype=np.uint64)
+    digits = (limbs[:, None] // _limb_powers() % np.uint64(10)).ravel().astype(np.uint8)
+    nonzero = np.flatnonzero(digits)
+    return digits[:nonzero[-1] + 1] if nonzero.size else digits[:1]
+
+def add_limbs(a, b):
+    """
+    Add two numbers given as base-10**18 limbs, with the carries resolved in bulk.
+
+    A limb sum of at least 10**18 generates a carry, and a limb sum of exactly 10**18 - 1 passes
+    an incoming carry on. So the carry out of a limb is the one generated at the nearest limb at
+    or below it that does not pass carries on, which a running maximum of indices finds without
+    a Python loop over the limbs.
+
+    Args:
+        a, b (numpy.ndarray): uint64 limbs, least significant limb first.
+    Returns:
+        numpy.ndarray: uint64 limbs of the sum, least significant limb first (empty if both inputs are).
+    """
+    import numpy as np
+    a = np.asarray(a, dtype=np.uint64)
+    b = np.asarray(b, dtype=np.uint64)
+    if a.size < b.size:
+        a, b = b, a
+    total = a.copy()
+    if total.size == 0:
+        return total
+    total[:b.size] += b
+    generate = total >= np.uint64(LIMB_BASE)
+    propagate = total == np.uint64(LIMB_BASE - 1)
+    index = np.arange(total.size)
+    # Index of the nearest limb at or below each limb that does not pass carries on (-1 if none)
+    stop = np.maximum.accumulate(np.where(propagate, -1, index))
+    carry_out = np.where(stop >= 0, generate[np.maximum(stop, 0)], False)
+    carry_in = np.concatenate(([False], carry_out[:-1]))
+    total += carry_in.astype(np.uint64)
+    total[total >= np.uint64(LIMB_BASE)] -= np.uint64(LIMB_BASE)
+    if carry_out[-1]:
+        total = np.append(total, np.uint64(1))
+    return total
+
+def _linked_digits(node):
+    """
+    Collect the digits of a linked list (reverse order) into a uint8 array.
+    Raises:
+        ValueError: If a digit does not fit in a byte.
+    """
+    import numpy as np
+    digits = array('B')
+    try:
+        while node:
+            digits.append(node.val)
+            node = node.next
+    except OverflowError:
+        raise ValueError("Digits must be between 0 and 9")
+    return np.frombuffer(digits, dtype=np.uint8)
+
+def _digits_to_linked(digits):
+    """
+    Convert digits (least significant first) to a linked list, or None if there are none.
+    """
+    # Build from the most significant digit down, so each node is created with its successor
+    head = None
+    for digit in digits[::-1].tolist():
+        head = ListNode(digit, head)
+    return head
+
+def linked_to_limbs(node):
+    """
+    Convert a linked list of digits (reverse order) to base-10**18 limbs.
+    Args:
+        node (ListNode): Head of the linked list.
+    Returns:
+        numpy.ndarray: uint64 limbs, least significant limb first.
+    """
+    return digits_to_limbs(_linked_digits(node))
+
+def limbs_to_linked(limbs):
+    """
+    Convert base-10**18 limbs to a linked list of digits (reverse order).
+    Args:
+        limbs (numpy.ndarray): uint64 limbs, least significant limb first.
+    Returns:
+        ListNode: Head of the linked list.
+    """
+    return _digits_to_linked(limbs_to_digits(limbs))
+
+def add_two_numbers_limbs(l1, l2):
+    """
+    Same result as add_two_numbers, computed on base-10**18 limbs instead of digit by digit.
+    As there, the sum has at least as many digits as the longer input (leading zeros are kept),
+    and two empty lists give None.
+    Args:
+        l1 (ListNode): Head of the first linked list.
+        l2 (ListNode): Head of the second linked list.
+    Returns:
+        ListNode: Head of the resulting linked list representing the sum.
+    Raises:
+        ValueError: If a digit is not between 0 and 9.
+    """
+    import numpy as np
+    digits1 = _linked_digits(l1)
+    digits2 = _linked_digits(l2)
+    length = max(digits1.size, digits2.size)
+    if length == 0:
+        return None
+    total = limbs_to_digits(add_limbs(digits_to_limbs(digits1), digits_to_limbs(digits2)))
+    if total.size < length:
+        total = np.concatenate((total, np.zeros(length - total.size, dtype=total.dtype)))
+    return _digits_to_linked(total)
+
 def add_numbers(a, b):
     """
     Add two numbers together with input validation and overflow protection.
@@ -114,6 +279,158 @@ def add_numbers(a, b):
     
     return result
 
+def _as_float_array(values):
+    """
+    Convert an array of inputs to float64 and flag the entries add_numbers would reject.
+
+    Numeric and boolean arrays are converted in bulk. Object arrays (mixed Python values) are
+    checked entry by entry, since only their entries carry a type; ints too large for a float
+    are flagged as well.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: (float64 values with NaN where invalid, bool mask of invalid entries)
+    """
+    import numpy as np
+    if values.dtype.kind in 'biuf':
+        return values.astype(np.float64), np.zeros(values.shape, dtype=bool)
+    if values.dtype.kind != 'O':
+        return np.full(values.shape, np.nan), np.ones(values.shape, dtype=bool)
+
+    def convert(value):
+        if not isinstance(value, (int, float)):
+            return math.nan, True
+        try:
+            return float(value), False
+        except OverflowError:
+            return math.nan, True
+    converted = [convert(value) for value in values.ravel().tolist()]
+    floats = np.fromiter((value for value, _ in converted), dtype=np.float64, count=len(converted))
+    invalid = np.fromiter((bad for _, bad in converted), dtype=bool, count=len(converted))
+    return floats.reshape(values.shape), invalid.reshape(values.shape)
+
+def add_numbers_batch(a, b):
+    """
+    Add many pairs of numbers at once, with the checks of add_numbers done on whole arrays.
+
+    Args:
+        a, b (array-like): Equally long arrays, lists or DataFrame columns of numbers.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: (float64 sums, bool error mask). An entry is an error
+        where add_numbers would raise: an input that is not an int or float, an input beyond the
+        float range, or a sum beyond it. Its sum is NaN.
+
+    Raises:
+        ValueError: If the inputs differ in shape.
+    """
+    import numpy as np
+    a = np.asarray(a)
+    b = np.asarray(b)
+    if a.shape != b.shape:
+        raise ValueError(f"Inputs must have the same shape, got {a.shape} and {b.shape}")
+    a_float, a_invalid = _as_float_array(a)
+    b_float, b_invalid = _as_float_array(b)
+    with np.errstate(over='ignore', invalid='ignore'):
+        result = a_float + b_float
+        errors = (a_invalid | b_invalid | (np.abs(a_float) > sys.float_info.max)
+                  | (np.abs(b_float) > sys.float_info.max) | (np.abs(result) > sys.float_info.max))
+    result[errors] = np.nan
+    return result, errors
+
+def _has_extra_whitespace(text):
+    """
+    Tell whether text holds whitespace that NumPy's text parser splits on but PAIR_PATTERN rejects.
+    """
+    if text.isascii() and '\r' not in text:
+        # Substring searches are much faster than a regex scan of the whole chunk
+        return any(char in text for char in '\x0b\x0c\x1c\x1d\x1e\x1f')
+    return EXTRA_WHITESPACE_PATTERN.search(text) is not None
+
+def parse_pairs(lines):
+    """
+    Parse lines of two numbers each ("3 5" or "3,5") into arrays.
+
+    Well-formed chunks are parsed by NumPy's C text parser in one call; only a chunk with a
+    malformed line is parsed line by line, with PAIR_PATTERN. Malformed lines and unparsable
+    numbers are flagged instead of raising.
+
+    Args:
+        lines (list[str]): Lines without blank ones.
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]: (first numbers, second numbers, bool mask
+        of lines that could not be parsed); unparsed entries are NaN.
+    """
+    import numpy as np
+    invalid = np.zeros(len(lines), dtype=bool)
+    text = ''.join(lines)
+    if not _has_extra_whitespace(text):
+        # A chunk with commas must use them on every line; empty fields and mixed separators fail the parse
+        delimiter = ',' if ',' in text else None
+        try:
+            numbers = np.loadtxt(lines, dtype=np.float64, delimiter=delimiter, comments=None, ndmin=2)
+            if numbers.shape == (len(lines), 2):
+                return numbers[:, 0], numbers[:, 1], invalid
+        except ValueError:
+            pass
+    numbers = np.full((len(lines), 2), np.nan)
+    for i, line in enumerate(lines):
+        match = PAIR_PATTERN.match(line.rstrip('\n'))
+        try:
+            numbers[i] = [float(match.group(1)), float(match.group(2))]
+        except (AttributeError, ValueError):
+            invalid[i] = True
+    return numbers[:, 0], numbers[:, 1], invalid
+
+def add_number_stream(lines, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Add pairs of numbers read lazily from lines (e.g. an open file), chunk by chunk.
+
+    Blank lines are skipped. Lines that cannot be parsed are errors, like overflows.
+
+    Yields:
+        tuple[numpy.ndarray, numpy.ndarray]: (float64 sums, bool error mask) per chunk of non-blank lines.
+    """
+    chunk = []
+    for line in lines:
+        if line.strip():
+            chunk.append(line)
+            if len(chunk) >= chunk_size:
+                yield _add_chunk(chunk)
+                chunk = []
+    if chunk:
+        yield _add_chunk(chunk)
+
+def _add_chunk(lines):
+    import numpy as np
+    a, b, invalid = parse_pairs(lines)
+    result, errors = add_numbers_batch(a, b)
+    errors |= invalid
+    result[errors] = np.nan
+    return result, errors
+
+def run_batch(filename):
+    """
+    Print the sum of every line of a file ('-' for stdin), or "error", one per non-blank line.
+
+    Returns:
+        tuple[int, int]: (pairs processed, errors)
+    """
+    import numpy as np
+    pairs = failures = 0
+    file = sys.stdin if filename == '-' else open(filename, 'r')
+    try:
+        for result, errors in add_number_stream(file):
+            output = list(map(repr, result.tolist()))
+            for i in np.flatnonzero(errors).tolist():
+                output[i] = 'error'
+            sys.stdout.write('\n'.join(output) + '\n')
+            pairs += len(output)
+            failures += int(errors.sum())
+    finally:
+        if file is not sys.stdin:
+            file.close()
+    return pairs, failures
+
 def parse_input(value):
     """
     Parse input string to number with validation.
@@ -133,8 +450,24 @@ def parse_input(value):
         raise ValueError(f"Invalid number: {value}")
 
 def main():
+    # Batch mode: add the pairs of a file or stdin
+    if len(sys.argv) in (2, 3) and sys.argv[1] == '--batch':
+        filename = sys.argv[2] if len(sys.argv) == 3 else '-'
+        start = time.perf_counter()
+        try:
+            pairs, failures = run_batch(filename)
+        except FileNotFoundError:
+            print(f"Error: File '{filename}' not found.", file=sys.stderr)
+            sys.exit(1)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Error reading input: {e}", file=sys.stderr)
+            sys.exit(1)
+        elapsed = time.perf_counter() - start
+        print(f"{pairs} pairs added, {failures} errors, in {elapsed:.2f}s", file=sys.stderr)
+        if failures:
+            sys.exit(1)
     # Check if command line arguments are provided
-    if len(sys.argv) == 3:
+    elif len(sys.argv) == 3:
         try:
             num1 = parse_input(sys.argv[1])
             num2 = parse_input(sys.argv[2])
@@ -2,14 +2,218 @@
 
 import sys
 import os
-from PIL import Image
-from typing import Tuple, List
+import io
+import math
+import struct
+import tempfile
+import time
+import json
+import shutil
+import hashlib
+import threading
+from PIL import Image, features
+from typing import Tuple, List, NamedTuple, Optional, Iterator, BinaryIO
 import argparse
+import multiprocessing as mp
 
 # Target dimensions
 TARGET_WIDTH = 640
 TARGET_HEIGHT = 480
 
+# Interpolation methods: Pillow filters and the NumPy batch backend
+PILLOW_METHODS = ['nearest', 'bilinear', 'bicubic']
+NUMPY_METHODS = ['np-bilinear', 'np-area']
+# Output pixels per dense block in the NumPy backend's banded matrix products
+NUMPY_BLOCK = 8
+# Inputs per batch job when np-* methods resize several files from the command line
+NUMPY_BATCH_SIZE = 32
+
+# Per-format encoder settings. A profile may override the quality, so tiers
+# that need less fidelity can be encoded smaller and faster.
+ENCODER_SETTINGS = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'WEBP': {'quality': 80, 'method': 4},
+    'AVIF': {'quality': 60, 'speed': 6},
+    'PNG': {'optimize': True},
+}
+
+# Save options of the default output (no profiles), unchanged from before
+# profiles existed
+DEFAULT_SAVE_OPTIONS = {'quality': 95}
+
+# File extensions used when a profile converts to another format
+FORMAT_EXTENSIONS = {
+    'JPEG': '.jpg',
+    'WEBP': '.webp',
+    'AVIF': '.avif',
+    'PNG': '.png',
+}
+
+# Default size limit of the thumbnail cache
+DEFAULT_CACHE_MB = 512
+
+# In memory-bounded mode, sources are reduced to no less than this multiple
+# of the target size before the final interpolation (like Pillow's reducing_gap)
+REDUCING_GAP = 2
+
+# In service mode, at most this many jobs per worker are read from stdin
+# ahead of the responses written back
+SERVE_JOBS_PER_WORKER = 2
+
+# Bits per pixel of the uncompressed layouts that can be decoded in strips
+RAW_BITS_PER_PIXEL = {
+    'L': 8,
+    'RGB': 24,
+    'BGR': 24,
+    'RGBA': 32,
+    'BGRA': 32,
+    'RGBX': 32,
+    'CMYK': 32,
+}
+
+class Profile(NamedTuple):
+    """Output tier: target box, output format (None keeps the input format) and quality override.
+
+    Untuned profiles are saved with DEFAULT_SAVE_OPTIONS instead of ENCODER_SETTINGS.
+    """
+    width: int
+    height: int
+    format: Optional[str] = None
+    quality: Optional[int] = None
+    tuned: bool = True
+
+DEFAULT_PROFILE = Profile(TARGET_WIDTH, TARGET_HEIGHT, tuned=False)
+
+def parse_profile(spec: str) -> Profile:
+    """Parse a profile spec of the form WIDTHxHEIGHT[:FORMAT[:QUALITY]], e.g. 320x240:webp:70."""
+    parts = spec.split(':')
+    if len(parts) > 3:
+        raise ValueError(f"Invalid profile: {spec}")
+    try:
+        width, height = (int(v) for v in parts[0].lower().split('x'))
+    except ValueError:
+        raise ValueError(f"Invalid profile size: {parts[0]}")
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Profile size must be positive: {parts[0]}")
+
+    format = None
+    if len(parts) > 1 and parts[1]:
+        format = parts[1].upper()
+        if format == 'JPG':
+            format = 'JPEG'
+
+    quality = None
+    if len(parts) > 2 and parts[2]:
+        quality = int(parts[2])
+        if not 1 <= quality <= 100:
+            raise ValueError(f"Profile quality must be between 1 and 100: {quality}")
+
+    return Profile(width, height, format, quality)
+
+def check_format_support(format: str) -> None:
+    """Raise ValueError if Pillow cannot write the given output format."""
+    Image.init()
+    if format not in Image.SAVE:
+        raise ValueError(f"Unsupported output format: {format}")
+    if format in ('WEBP', 'AVIF') and not features.check(format.lower()):
+        raise ValueError(f"Pillow was built without {format} support")
+
+def encoder_options(format: str, quality: Optional[int] = None, tuned: bool = True) -> dict:
+    """Return the save() keyword arguments for a format, with an optional quality override."""
+    options = dict(ENCODER_SETTINGS.get(format, {}) if tuned else DEFAULT_SAVE_OPTIONS)
+    if quality is not None:
+        options['quality'] = quality
+    return options
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ThumbnailCache:
+    """Content-addressed on-disk cache of resized images with LRU eviction by total bytes.
+
+    Entries are keyed by the hash of the source bytes, the method, the target
+    size and the encoder settings, so duplicate uploads under different names
+    share one entry. Recency is tracked through file modification times.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_CACHE_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self.total_bytes = sum(size for _, _, size in self._entries())
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self) -> List[Tuple[float, str, int]]:
+        """List (mtime, path, size) for every cached file."""
+        entries = []
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    @staticmethod
+    def make_key(source_digest: str, method: str, profile: Profile, format: str) -> str:
+        """Build the cache key for one rendition of a source image."""
+        options = encoder_options(format, profile.quality, profile.tuned)
+        material = json.dumps([source_digest, method, profile.width, profile.height, format,
+                               sorted(options.items())])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def fetch(self, key: str, output_path: str) -> bool:
+        """Copy a cached rendition to output_path. Returns False on a miss."""
+        path = self._path(key)
+        try:
+            shutil.copyfile(path, output_path)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        os.utime(path)  # Mark as most recently used
+        self.hits += 1
+        return True
+
+    def store(self, key: str, output_path: str) -> None:
+        """Add a freshly written output file to the cache and evict if over budget."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        shutil.copyfile(output_path, tmp_path)
+        os.replace(tmp_path, path)
+        self.total_bytes += os.path.getsize(path)
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = sorted(self._entries())
+        self.total_bytes = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if self.total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.total_bytes -= size
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
 def get_image_info(image_path: str) -> Tuple[str, str]:
     """Get image format and extension."""
     try:
@@ -21,89 +225,720 @@ def get_image_info(image_path: str) -> Tuple[str, str]:
     except Exception as e:
         raise ValueError(f"Error reading image: {str(e)}")
 
-def resize_image(input_path: str, output_path: str, method: str) -> None:
-    """Resize image using specified interpolation method."""
+def get_resample(method: str) -> int:
+    """Map an interpolation method name to a Pillow resampling filter."""
+    if method == 'nearest':
+        return Image.NEAREST
+    elif method == 'bilinear':
+        return Image.BILINEAR
+    elif method == 'bicubic':
+        return Image.BICUBIC
+    raise ValueError(f"Unknown interpolation method: {method}")
+
+def _filter_taps(in_size: int, out_size: int, method: str):
+    """Return (indices, weights), each of shape (out_size, taps), for resampling one axis.
+
+    np-bilinear is a triangle filter widened by the scale factor when
+    downscaling (antialiased, like Pillow); np-area weights each source pixel by
+    how much of it the output pixel covers.
+    """
+    import numpy as np
+
+    scale = in_size / out_size
+    centers = (np.arange(out_size) + 0.5) * scale
+    support = scale / 2 if method == 'np-area' else max(scale, 1.0)
+    first = np.floor(centers - support).astype(np.int64)
+    taps = int(math.ceil(2 * support)) + 2
+    indices = first[:, None] + np.arange(taps)[None, :]
+
+    if method == 'np-area':
+        weights = np.minimum(centers[:, None] + support, indices + 1) - np.maximum(centers[:, None] - support, indices)
+        weights = np.clip(weights, 0, None)
+    elif method == 'np-bilinear':
+        weights = np.clip(1 - np.abs(indices + 0.5 - centers[:, None]) / support, 0, None)
+    else:
+        raise ValueError(f"Unknown interpolation method: {method}")
+
+    weights[(indices < 0) | (indices >= in_size)] = 0
+    weights /= weights.sum(axis=1, keepdims=True)
+    return np.clip(indices, 0, in_size - 1), weights.astype(np.float32)
+
+def _axis_blocks(in_size: int, out_size: int, method: str):
+    """Split one axis' resampling matrix into dense (out_start, out_end, in_start, in_end, weights) blocks."""
+    import numpy as np
+
+    indices, weights = _filter_taps(in_size, out_size, method)
+    blocks = []
+    for start in range(0, out_size, NUMPY_BLOCK):
+        end = min(start + NUMPY_BLOCK, out_size)
+        block_indices = indices[start:end]
+        in_start, in_end = int(block_indices.min()), int(block_indices.max()) + 1
+        matrix = np.zeros((end - start, in_end - in_start), dtype=np.float32)
+        rows = np.repeat(np.arange(end - start), block_indices.shape[1])
+        np.add.at(matrix, (rows, block_indices.ravel() - in_start), weights[start:end].ravel())
+        blocks.append((start, end, in_start, in_end, matrix))
+    return blocks
+
+def numpy_resize_batch(batch, size: Tuple[int, int], method: str):
+    """Resize a uint8 array of same-sized images, shaped (N, H, W, C), to size=(width, height).
+
+    The filter is separable and banded, so each axis is applied as a series of
+    small dense matrix products (one per block of NUMPY_BLOCK output pixels)
+    over the whole batch, which NumPy hands to BLAS.
+    """
+    import numpy as np
+
+    width, height = size
+    count, in_height, in_width, channels = batch.shape
+    column_blocks = _axis_blocks(in_width, width, method)
+    result = np.empty((count, height, channels, width), dtype=np.float32)
+    for start, end, in_start, in_end, matrix in _axis_blocks(in_height, height, method):
+        rows = batch[:, in_start:in_end].astype(np.float32).reshape(count, in_end - in_start, -1)
+        # (N, rows, W, C) -> (N, rows, C, W) so the column pass contracts the last axis
+        vertical = np.matmul(matrix, rows).reshape(count, end - start, in_width, channels).transpose(0, 1, 3, 2)
+        for col_start, col_end, col_in_start, col_in_end, col_matrix in column_blocks:
+            result[:, start:end, :, col_start:col_end] = np.matmul(
+                vertical[..., col_in_start:col_in_end], col_matrix.T)
+    return np.clip(np.rint(result.transpose(0, 1, 3, 2)), 0, 255).astype(np.uint8)
+
+def _numpy_mode(img: Image.Image) -> str:
+    """Pick the 8-bit mode an image is converted to for the NumPy backend."""
+    if img.mode in ('L', 'RGB', 'RGBA'):
+        return img.mode
+    return 'RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB'
+
+def numpy_resize(img: Image.Image, size: Tuple[int, int], method: str) -> Image.Image:
+    """Resize a single Pillow image with the NumPy backend."""
+    import numpy as np
+
+    mode = _numpy_mode(img)
+    array = np.asarray(img.convert(mode) if img.mode != mode else img)
+    if array.ndim == 2:
+        array = array[:, :, None]
+    resized = numpy_resize_batch(array[None], size, method)[0]
+    return Image.fromarray(resized[:, :, 0] if mode == 'L' else resized, mode)
+
+def benchmark_backends(samples: List[Image.Image], batch_size: int = 32,
+                       size: Tuple[int, int] = (TARGET_WIDTH, TARGET_HEIGHT)) -> List[Tuple[str, float]]:
+    """Measure batch throughput (images/s) of Pillow filters and the NumPy backend.
+
+    Samples are converted to RGB, cropped to the smallest common size and
+    cycled to fill the batch. Pillow methods resize image by image; NumPy
+    methods convert the batch to one array and resize it in a single call.
+    """
+    import numpy as np
+
+    width = min(img.width for img in samples)
+    height = min(img.height for img in samples)
+    images = [samples[i % len(samples)].convert('RGB').crop((0, 0, width, height)) for i in range(batch_size)]
+    new_size = compute_target_size((width, height), size[0], size[1])
+
+    results = []
+    for method in PILLOW_METHODS + NUMPY_METHODS:
+        start = time.perf_counter()
+        if method in NUMPY_METHODS:
+            batch = np.stack([np.asarray(img) for img in images])
+            resized = numpy_resize_batch(batch, new_size, method)
+            [Image.fromarray(array) for array in resized]
+        else:
+            resample = get_resample(method)
+            [img.resize(new_size, resample) for img in images]
+        results.append((method, batch_size / (time.perf_counter() - start)))
+    return results
+
+def compute_target_size(size: Tuple[int, int], target_width: int, target_height: int) -> Tuple[int, int]:
+    """Fit size into the target box while maintaining aspect ratio."""
+    width, height = size
+    aspect_ratio = width / height
+    target_ratio = target_width / target_height
+
+    if aspect_ratio > target_ratio:
+        new_width = target_width
+        new_height = int(target_width / aspect_ratio)
+    else:
+        new_height = target_height
+        new_width = int(target_height * aspect_ratio)
+    return max(new_width, 1), max(new_height, 1)
+
+def convert_for_format(img: Image.Image, format: str) -> Image.Image:
+    """Convert image modes the target encoder cannot store (e.g. alpha for JPEG)."""
+    if format == 'JPEG' and img.mode not in ('RGB', 'L', 'CMYK'):
+        return img.convert('RGB')
+    return img
+
+def estimate_decode_bytes(size: Tuple[int, int], mode: str) -> int:
+    """Approximate the memory Pillow needs to hold a decoded image of this size and mode."""
+    if mode in ('1', 'L', 'P'):
+        bytes_per_pixel = 1
+    elif mode.startswith('I;16'):
+        bytes_per_pixel = 2
+    else:
+        bytes_per_pixel = 4  # Pillow stores multi-band pixels in 32 bits
+    return size[0] * size[1] * bytes_per_pixel
+
+def estimate_peak_bytes(input_path: str, profiles: List[Profile], max_decode_bytes: Optional[int] = None) -> int:
+    """Estimate peak pixel memory for resizing one image, from its header only."""
+    with Image.open(input_path) as img:
+        decode_bytes = estimate_decode_bytes(img.size, img.mode)
+    if max_decode_bytes is not None:
+        decode_bytes = min(decode_bytes, max_decode_bytes)
+    # Resized copy plus a possible mode conversion for the largest tier
+    output_bytes = max(estimate_decode_bytes((p.width, p.height), 'RGBA') for p in profiles)
+    return decode_bytes + 2 * output_bytes
+
+def _raw_layout(img: Image.Image) -> Optional[Tuple[int, str, int, int]]:
+    """Return (offset, rawmode, stride, orientation) if img is stored as a single uncompressed tile."""
+    if len(img.tile) != 1 or img.mode not in ('L', 'RGB', 'RGBA', 'CMYK'):
+        return None
+    codec, extents, offset, args = img.tile[0][:4]
+    if codec != 'raw' or tuple(extents) != (0, 0) + img.size:
+        return None
+    if isinstance(args, str):
+        args = (args,)
+    rawmode = args[0]
+    stride = args[1] if len(args) > 1 else 0
+    orientation = args[2] if len(args) > 2 else 1
+    bits = RAW_BITS_PER_PIXEL.get(rawmode)
+    if bits is None:
+        return None
+    if not stride:
+        stride = (img.width * bits + 7) // 8
+    return offset, rawmode, stride, orientation
+
+def iter_raw_strips(input_path: str, img: Image.Image, layout: Tuple[int, str, int, int],
+                    rows: int) -> Iterator[Tuple[int, Image.Image]]:
+    """Decode an uncompressed image in horizontal strips of at most `rows` rows, yielding (top, strip)."""
+    offset, rawmode, stride, orientation = layout
+    width, height = img.size
+    with open(input_path, 'rb') as f:
+        for top in range(0, height, rows):
+            bottom = min(top + rows, height)
+            # Bottom-up files (e.g. BMP) store the last row first
+            first_row = top if orientation > 0 else height - bottom
+            f.seek(offset + first_row * stride)
+            data = f.read((bottom - top) * stride)
+            yield top, Image.frombuffer(img.mode, (width, bottom - top), data, 'raw', rawmode, stride, orientation)
+
+def load_within_budget(img: Image.Image, input_path: str, target_size: Tuple[int, int],
+                       max_decode_bytes: int) -> Image.Image:
+    """Decode img using at most max_decode_bytes of pixel memory.
+
+    JPEG sources are decoded at a reduced DCT scale (1/2 to 1/8). Uncompressed
+    sources (raw TIFF, BMP, PPM) are decoded in strips that are box-reduced as
+    they are read. Other formats must fit the budget at full size.
+    """
+    gap_size = (target_size[0] * REDUCING_GAP, target_size[1] * REDUCING_GAP)
+    if img.format == 'JPEG':
+        # Keep REDUCING_GAP x the target resolution unless the budget forces a deeper DCT reduction
+        scale = max([s for s in (1, 2, 4, 8) if s <= min(img.width // gap_size[0], img.height // gap_size[1])] or [1])
+        if estimate_decode_bytes((img.width // scale, img.height // scale), img.mode) <= max_decode_bytes:
+            img.draft(img.mode, gap_size)
+        else:
+            img.draft(img.mode, target_size)
+
+    if estimate_decode_bytes(img.size, img.mode) <= max_decode_bytes:
+        img.load()
+        return img
+
+    factor = max(1, min(img.width // gap_size[0], img.height // gap_size[1]))
+    layout = _raw_layout(img)
+    if layout is not None and factor > 1:
+        reduced_size = (math.ceil(img.width / factor), math.ceil(img.height / factor))
+        row_bytes = estimate_decode_bytes((img.width, 1), img.mode)
+        available = max_decode_bytes - estimate_decode_bytes(reduced_size, img.mode)
+        # Strip heights are multiples of the factor so strip-wise reduction equals a whole-image reduce
+        rows = available // row_bytes // factor * factor
+        if rows > 0:
+            reduced = Image.new(img.mode, reduced_size)
+            for top, strip in iter_raw_strips(input_path, img, layout, rows):
+                reduced.paste(strip.reduce(factor), (0, top // factor))
+            return reduced
+
+    needed_mb = estimate_decode_bytes(img.size, img.mode) / (1024 * 1024)
+    raise MemoryError(f"Decoding {img.format} image of {img.width}x{img.height} needs ~{needed_mb:.0f} MB, "
+                      f"over the {max_decode_bytes / (1024 * 1024):.0f} MB decode budget")
+
+def _pending_targets(input_path: str, img: Image.Image, method: str, targets: List[Tuple[Profile, str]],
+                     cache: Optional[ThumbnailCache]) -> Tuple[List[Tuple[Profile, str]], dict]:
+    """Copy targets the cache already holds to their output paths.
+
+    Returns the targets still to be rendered and their cache keys by output path.
+    """
+    if cache is None:
+        return targets, {}
+    source_digest = hash_file(input_path)
+    pending = []
+    keys = {}
+    for profile, output_path in targets:
+        key = cache.make_key(source_digest, method, profile, profile.format or img.format)
+        if not cache.fetch(key, output_path):
+            keys[output_path] = key
+            pending.append((profile, output_path))
+    return pending, keys
+
+def _decode_source(img: Image.Image, input_path: str, sizes: List[Tuple[int, int]],
+                   max_decode_bytes: Optional[int]) -> Image.Image:
+    """Decode img fully, or through load_within_budget() for the largest target size."""
+    if max_decode_bytes is None:
+        img.load()
+        return img
+    largest = (max(w for w, _ in sizes), max(h for _, h in sizes))
+    return load_within_budget(img, input_path, largest, max_decode_bytes)
+
+def _save_output(resized_img: Image.Image, profile: Profile, source_format: str, output_path: str,
+                 cache: Optional[ThumbnailCache], keys: dict) -> None:
+    """Encode one rendition with its profile's settings and add it to the cache."""
+    format = profile.format or source_format
+    resized_img = convert_for_format(resized_img, format)
+    resized_img.save(output_path, format=format, **encoder_options(format, profile.quality, profile.tuned))
+    if cache is not None:
+        cache.store(keys[output_path], output_path)
+
+def resize_to_profiles(input_path: str, method: str, targets: List[Tuple[Profile, str]],
+                       cache: Optional[ThumbnailCache] = None, max_decode_bytes: Optional[int] = None) -> None:
+    """Resize one image into every (profile, output path) target, decoding the source only once.
+
+    With a cache, targets already rendered for identical source bytes are
+    copied from the cache and the source is only decoded if something is missing.
+    With max_decode_bytes, the source is decoded through load_within_budget().
+    """
     try:
+        resample = None if method in NUMPY_METHODS else get_resample(method)
         with Image.open(input_path) as img:
-            # Get current dimensions
-            width, height = img.size
-            
-            # Calculate aspect ratio
-            aspect_ratio = width / height
-            target_ratio = TARGET_WIDTH / TARGET_HEIGHT
-            
-            # Calculate new dimensions while maintaining aspect ratio
-            if aspect_ratio > target_ratio:
-                new_width = TARGET_WIDTH
-                new_height = int(TARGET_WIDTH / aspect_ratio)
-            else:
-                new_height = TARGET_HEIGHT
-                new_width = int(TARGET_HEIGHT * aspect_ratio)
-            
-            # Choose interpolation method
-            if method == 'nearest':
-                resample = Image.NEAREST
-            elif method == 'bilinear':
-                resample = Image.BILINEAR
-            elif method == 'bicubic':
-                resample = Image.BICUBIC
-            else:
-                raise ValueError(f"Unknown interpolation method: {method}")
-            
-            # Resize image
-            resized_img = img.resize((new_width, new_height), resample)
-            
-            # Save the resized image
-            resized_img.save(output_path, quality=95)
-            
+            targets, keys = _pending_targets(input_path, img, method, targets, cache)
+            if not targets:
+                return
+
+            source_format = img.format
+            sizes = [compute_target_size(img.size, p.width, p.height) for p, _ in targets]
+            source = _decode_source(img, input_path, sizes, max_decode_bytes)
+
+            for (profile, output_path), new_size in zip(targets, sizes):
+                if resample is None:
+                    resized_img = numpy_resize(source, new_size, method)
+                else:
+                    resized_img = source.resize(new_size, resample)
+                _save_output(resized_img, profile, source_format, output_path, cache, keys)
+
     except Exception as e:
         raise RuntimeError(f"Error processing image: {str(e)}")
 
-def create_output_filename(input_path: str, method: str) -> str:
-    """Create output filename with method suffix."""
+def resize_batch(jobs: List[Tuple[str, List[Tuple[Profile, str]]]], method: str,
+                 cache: Optional[ThumbnailCache] = None,
+                 max_decode_bytes: Optional[int] = None) -> List[Optional[str]]:
+    """Resize several images with the NumPy backend, stacking same-sized sources into one batch.
+
+    jobs holds (input path, targets) pairs as taken by resize_to_profiles().
+    Sources with the same size and mode are resized with one
+    numpy_resize_batch() call per target size. Returns an error message (or
+    None) per job; a failing input does not affect the others.
+    """
+    import numpy as np
+
+    errors = [None] * len(jobs)
+    groups = {}
+    for index, (input_path, targets) in enumerate(jobs):
+        try:
+            with Image.open(input_path) as img:
+                targets, keys = _pending_targets(input_path, img, method, targets, cache)
+                if not targets:
+                    continue
+                sizes = [compute_target_size(img.size, p.width, p.height) for p, _ in targets]
+                source = _decode_source(img, input_path, sizes, max_decode_bytes)
+                mode = _numpy_mode(source)
+                array = np.asarray(source.convert(mode) if source.mode != mode else source)
+                key = (img.size, array.shape, mode)
+                groups.setdefault(key, []).append((index, array, img.format, targets, sizes, keys))
+        except Exception as e:
+            errors[index] = f"Error processing image: {str(e)}"
+
+    for (_, _, mode), items in groups.items():
+        batch = np.stack([array for _, array, _, _, _, _ in items])
+        if batch.ndim == 3:
+            batch = batch[:, :, :, None]
+        # Every item of a group has the same source size, so equal profiles give equal target sizes
+        by_size = {}
+        for position, (_, _, _, targets, sizes, _) in enumerate(items):
+            for target, new_size in zip(targets, sizes):
+                by_size.setdefault(new_size, []).append((position, target))
+        for new_size, members in by_size.items():
+            positions = [position for position, _ in members]
+            subset = batch if positions == list(range(len(items))) else batch[positions]
+            resized = numpy_resize_batch(subset, new_size, method)
+            for array, (position, (profile, output_path)) in zip(resized, members):
+                index, _, source_format, _, _, keys = items[position]
+                if errors[index] is not None:
+                    continue
+                try:
+                    resized_img = Image.fromarray(array[:, :, 0] if mode == 'L' else array, mode)
+                    _save_output(resized_img, profile, source_format, output_path, cache, keys)
+                except Exception as e:
+                    errors[index] = f"Error processing image: {str(e)}"
+    return errors
+
+def resize_image(input_path: str, output_path: str, method: str, profile: Optional[Profile] = None) -> None:
+    """Resize image using specified interpolation method."""
+    resize_to_profiles(input_path, method, [(profile or DEFAULT_PROFILE, output_path)])
+
+def create_output_filename(input_path: str, method: str, profile: Optional[Profile] = None,
+                           output_dir: Optional[str] = None) -> str:
+    """Create output filename with method suffix (and size suffix when a profile is given)."""
     base, ext = os.path.splitext(input_path)
-    return f"{base}_thumbnail_{method}{ext}"
+    if output_dir is not None:
+        base = os.path.join(output_dir, os.path.basename(base))
+    if profile is None:
+        return f"{base}_thumbnail_{method}{ext}"
+    if profile.format is not None:
+        ext = FORMAT_EXTENSIONS.get(profile.format, f".{profile.format.lower()}")
+    return f"{base}_thumbnail_{method}_{profile.width}x{profile.height}{ext}"
+
+def process_image(input_path: str, methods: List[str], profiles: List[Profile], named_profiles: bool,
+                  cache: Optional[ThumbnailCache] = None,
+                  max_decode_bytes: Optional[int] = None,
+                  output_dir: Optional[str] = None) -> List[Tuple[str, str]]:
+    """Resize one input with every method and profile. Returns (method, output path) pairs."""
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    if not os.path.isfile(input_path):
+        raise ValueError(f"Input path is not a file: {input_path}")
+
+    outputs = []
+    for method in methods:
+        targets = [
+            (profile, create_output_filename(input_path, method, profile if named_profiles else None, output_dir))
+            for profile in profiles
+        ]
+        resize_to_profiles(input_path, method, targets, cache, max_decode_bytes)
+        for _, output_path in targets:
+            # Verify output file
+            if not os.path.exists(output_path):
+                raise RuntimeError(f"Output file was not created: {output_path}")
+            outputs.append((method, output_path))
+    return outputs
+
+def process_batch(input_paths: List[str], methods: List[str], profiles: List[Profile], named_profiles: bool,
+                  cache: Optional[ThumbnailCache] = None,
+                  max_decode_bytes: Optional[int] = None,
+                  output_dir: Optional[str] = None) -> List[Tuple[str, List[Tuple[str, str]], Optional[str]]]:
+    """Resize several inputs like process_image(), with np-* methods batched across inputs.
+
+    Returns (input path, (method, output path) pairs, error) per input.
+    """
+    outputs = [[] for _ in input_paths]
+    errors = [None] * len(input_paths)
+    for index, input_path in enumerate(input_paths):
+        if not os.path.isfile(input_path):
+            errors[index] = f"Input file not found: {input_path}"
+
+    for method in methods:
+        jobs = [
+            (index, [(profile, create_output_filename(input_path, method, profile if named_profiles else None,
+                                                      output_dir))
+                     for profile in profiles])
+            for index, input_path in enumerate(input_paths) if errors[index] is None
+        ]
+        if method in NUMPY_METHODS:
+            job_errors = resize_batch([(input_paths[index], targets) for index, targets in jobs], method,
+                                      cache, max_decode_bytes)
+        else:
+            job_errors = []
+            for index, targets in jobs:
+                try:
+                    resize_to_profiles(input_paths[index], method, targets, cache, max_decode_bytes)
+                    job_errors.append(None)
+                except Exception as e:
+                    job_errors.append(str(e))
+
+        for (index, targets), error in zip(jobs, job_errors):
+            if error is None:
+                missing = [path for _, path in targets if not os.path.exists(path)]
+                if missing:
+                    error = f"Output file was not created: {missing[0]}"
+            if error is not None:
+                errors[index] = error
+                continue
+            outputs[index].extend((method, output_path) for _, output_path in targets)
+
+    return [(input_path, outputs[index] if errors[index] is None else [], errors[index])
+            for index, input_path in enumerate(input_paths)]
+
+def safe_worker_count(requested: int, peak_bytes: int, memory_budget_bytes: Optional[int]) -> int:
+    """Cap the worker count so that workers * per-image peak memory stays within the budget."""
+    if memory_budget_bytes is None:
+        return requested
+    return max(1, min(requested, memory_budget_bytes // max(peak_bytes, 1)))
+
+# Per-process state of batch workers
+_worker_cache: Optional[ThumbnailCache] = None
+
+def _init_worker(cache_dir: Optional[str], cache_max_bytes: int) -> None:
+    global _worker_cache
+    _worker_cache = ThumbnailCache(cache_dir, cache_max_bytes) if cache_dir else None
+
+def _process_job(job: tuple) -> tuple:
+    """Run process_image() for a batch job; returns (input, outputs, error, cache hits, cache misses)."""
+    input_path, methods, profiles, named_profiles, max_decode_bytes, output_dir = job
+    hits = _worker_cache.hits if _worker_cache else 0
+    misses = _worker_cache.misses if _worker_cache else 0
+    try:
+        outputs = process_image(input_path, methods, profiles, named_profiles, _worker_cache,
+                                max_decode_bytes, output_dir)
+        error = None
+    except Exception as e:
+        outputs, error = [], str(e)
+    if _worker_cache:
+        hits, misses = _worker_cache.hits - hits, _worker_cache.misses - misses
+    return input_path, outputs, error, hits, misses
+
+def _process_batch_job(job: tuple) -> tuple:
+    """Run process_batch() for a group of inputs; returns (per-input results, cache hits, cache misses)."""
+    input_paths, methods, profiles, named_profiles, max_decode_bytes, output_dir = job
+    hits = _worker_cache.hits if _worker_cache else 0
+    misses = _worker_cache.misses if _worker_cache else 0
+    results = process_batch(input_paths, methods, profiles, named_profiles, _worker_cache,
+                            max_decode_bytes, output_dir)
+    if _worker_cache:
+        hits, misses = _worker_cache.hits - hits, _worker_cache.misses - misses
+    return results, hits, misses
+
+def _process_frame(job: tuple) -> tuple:
+    """Resize an in-memory image frame.
+
+    The frame is spooled to a temporary file so it goes through the same path
+    as file inputs. Without an output directory the rendered files are read back
+    and returned as bytes; returns (index, outputs, payloads, error, hits, misses).
+    """
+    index, data, methods, profiles, named_profiles, max_decode_bytes, output_dir = job
+    with tempfile.TemporaryDirectory(prefix='image_resizer_') as spool_dir:
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                ext = FORMAT_EXTENSIONS.get(img.format, f".{(img.format or 'img').lower()}")
+        except Exception as e:
+            return index, [], [], f"Error reading image: {str(e)}", 0, 0
+        input_path = os.path.join(spool_dir, f"frame{index:06d}{ext}")
+        with open(input_path, 'wb') as f:
+            f.write(data)
+        _, outputs, error, hits, misses = _process_job(
+            (input_path, methods, profiles, named_profiles, max_decode_bytes, output_dir or spool_dir))
+        payloads = []
+        if output_dir is None:
+            for _, output_path in outputs:
+                with open(output_path, 'rb') as f:
+                    payloads.append(f.read())
+    return index, outputs, payloads, error, hits, misses
+
+def read_frames(stream: BinaryIO) -> Iterator[bytes]:
+    """Yield length-prefixed frames (4-byte big-endian length, then payload) until EOF."""
+    while True:
+        header = stream.read(4)
+        if len(header) < 4:
+            return
+        (length,) = struct.unpack('>I', header)
+        data = stream.read(length)
+        if len(data) < length:
+            raise EOFError("Truncated frame on stdin")
+        yield data
+
+def write_frame(stream: BinaryIO, data: bytes) -> None:
+    stream.write(struct.pack('>I', len(data)))
+    stream.write(data)
+
+def bounded_jobs(jobs: Iterator[tuple], slots: threading.Semaphore) -> Iterator[tuple]:
+    """Yield jobs, taking a slot for each; the consumer releases a slot per finished job."""
+    for job in jobs:
+        slots.acquire()
+        yield job
+
+def serve(mode: str, pool: Optional['mp.pool.Pool'], methods: List[str], profiles: List[Profile],
+          named_profiles: bool, max_decode_bytes: Optional[int], output_dir: Optional[str],
+          workers: int = 1) -> None:
+    """Resize images from stdin until EOF, keeping Pillow and the worker pool warm between requests.
+
+    In 'paths' mode stdin carries one image path per line and one JSON line is
+    written per input. In 'frames' mode stdin carries length-prefixed image
+    bytes; for each frame the response is a 4-byte count followed by that many
+    length-prefixed output images (a count of 0 means the frame failed), or a
+    JSON line if an output directory is given.
+
+    With a pool, the pool's feeder thread reads stdin, but never more than
+    SERVE_JOBS_PER_WORKER * workers jobs ahead of the responses, so pending
+    frames do not pile up in memory when the client writes faster than the
+    workers resize.
+    """
+    slots = threading.Semaphore(SERVE_JOBS_PER_WORKER * workers)
+
+    def run(func, jobs):
+        if pool is None:
+            yield from map(func, jobs)
+            return
+        for result in pool.imap(func, bounded_jobs(jobs, slots)):
+            yield result
+            slots.release()
+
+    if mode == 'paths':
+        paths = (line.strip() for line in sys.stdin)
+        jobs = ((path, methods, profiles, named_profiles, max_decode_bytes, output_dir) for path in paths if path)
+        for input_path, outputs, error, _, _ in run(_process_job, jobs):
+            print(json.dumps({'input': input_path, 'outputs': [path for _, path in outputs], 'error': error}),
+                  flush=True)
+        return
+
+    jobs = ((index, data, methods, profiles, named_profiles, max_decode_bytes, output_dir)
+            for index, data in enumerate(read_frames(sys.stdin.buffer)))
+    out = sys.stdout.buffer
+    for index, outputs, payloads, error, _, _ in run(_process_frame, jobs):
+        if error is not None:
+            print(f"Error in frame {index}: {error}", file=sys.stderr)
+        if output_dir is not None:
+            out.write((json.dumps({'frame': index, 'outputs': [path for _, path in outputs],
+                                   'error': error}) + '\n').encode('utf-8'))
+        else:
+            out.write(struct.pack('>I', len(payloads)))
+            for payload in payloads:
+                write_frame(out, payload)
+        out.flush()
 
 def main():
     # Set up argument parser
     parser = argparse.ArgumentParser(description='Resize images using different interpolation methods')
-    parser.add_argument('input_image', help='Path to the input image file')
-    parser.add_argument('--methods', nargs='+', default=['nearest', 'bilinear', 'bicubic'],
-                       choices=['nearest', 'bilinear', 'bicubic'],
-                       help='Interpolation methods to use (default: all methods)')
+    parser.add_argument('input_images', nargs='*', help='Paths to the input image files')
+    parser.add_argument('--methods', nargs='+', default=PILLOW_METHODS,
+                       choices=PILLOW_METHODS + NUMPY_METHODS,
+                       help='Interpolation methods to use; np-* methods use the NumPy batch backend '
+                            '(default: all Pillow methods)')
+    parser.add_argument('--profiles', nargs='+', type=parse_profile, default=None,
+                       help='Output tiers as WIDTHxHEIGHT[:FORMAT[:QUALITY]], '
+                            'e.g. 320x240:webp:70 1280x960:jpeg (default: 640x480 in the input format)')
+    parser.add_argument('--cache-dir', default=None,
+                       help='Directory of a content-addressed thumbnail cache (default: no cache)')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_CACHE_MB,
+                       help=f'Maximum size of the thumbnail cache in MB (default: {DEFAULT_CACHE_MB})')
+    parser.add_argument('--max-decode-mb', type=int, default=None,
+                       help='Per-process cap on decoded pixel memory in MB; large JPEGs are decoded at '
+                            'reduced scale and uncompressed images in strips (default: no cap)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Number of worker processes for batches (default: 1)')
+    parser.add_argument('--memory-budget-mb', type=int, default=None,
+                       help='Total memory budget in MB; the worker count is reduced so that '
+                            'workers x per-image peak stays within it (default: no budget)')
+    parser.add_argument('--output-dir', default=None,
+                       help='Directory for resized images (default: next to each input)')
+    parser.add_argument('--serve', choices=['paths', 'frames'], default=None,
+                       help='Run as a long-lived service reading image paths (one per line) or '
+                            'length-prefixed image bytes from stdin until EOF')
+    parser.add_argument('--benchmark', type=int, metavar='BATCH', default=None,
+                       help='Benchmark batch throughput of every method on BATCH images built from '
+                            'the inputs (or synthetic images) instead of resizing')
     args = parser.parse_args()
+    if args.benchmark is not None:
+        if args.input_images:
+            samples = [Image.open(path) for path in args.input_images]
+        else:
+            samples = [Image.effect_noise((1600, 1200), 64).convert('RGB')]
+        target = args.profiles[0] if args.profiles else DEFAULT_PROFILE
+        print(f"Batch of {args.benchmark} images, target {target.width}x{target.height}:")
+        for method, rate in benchmark_backends(samples, args.benchmark, (target.width, target.height)):
+            print(f"{method:>12}: {rate:8.1f} images/s")
+        return
+    if not args.input_images and args.serve is None:
+        parser.error('at least one input image is required unless --serve is given')
 
     try:
-        # Validate input file
-        if not os.path.exists(args.input_image):
-            raise FileNotFoundError(f"Input file not found: {args.input_image}")
-        
-        if not os.path.isfile(args.input_image):
-            raise ValueError(f"Input path is not a file: {args.input_image}")
-        
-        # Get image format
-        format, ext = get_image_info(args.input_image)
-        print(f"Input image format: {format}")
-        
-        # Process image with each method
-        for method in args.methods:
-            output_path = create_output_filename(args.input_image, method)
-            print(f"\nProcessing with {method} interpolation...")
-            resize_image(args.input_image, output_path, method)
-            print(f"Saved resized image to: {output_path}")
-            
-            # Verify output file
-            if not os.path.exists(output_path):
-                raise RuntimeError(f"Output file was not created: {output_path}")
-            
-            # Print output image info
-            with Image.open(output_path) as img:
-                print(f"Output dimensions: {img.size}")
-                print(f"Output format: {img.format}")
-        
+        profiles = args.profiles or [DEFAULT_PROFILE]
+        max_decode_bytes = args.max_decode_mb * 1024 * 1024 if args.max_decode_mb else None
+        cache_max_bytes = args.cache_max_mb * 1024 * 1024
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+
+        if args.serve is not None:
+            for profile in profiles:
+                if profile.format is not None:
+                    check_format_support(profile.format)
+            if max_decode_bytes is not None and args.memory_budget_mb:
+                workers = safe_worker_count(args.workers, max_decode_bytes, args.memory_budget_mb * 1024 * 1024)
+            else:
+                workers = args.workers
+            pool = None
+            if workers > 1:
+                pool = mp.Pool(workers, initializer=_init_worker, initargs=(args.cache_dir, cache_max_bytes))
+            else:
+                _init_worker(args.cache_dir, cache_max_bytes)
+            try:
+                serve(args.serve, pool, args.methods, profiles, args.profiles is not None,
+                      max_decode_bytes, args.output_dir, workers)
+            finally:
+                if pool is not None:
+                    pool.close()
+                    pool.join()
+            return
+
+        peak_bytes = 0
+        for input_image in args.input_images:
+            if not os.path.isfile(input_image):
+                raise FileNotFoundError(f"Input file not found: {input_image}")
+            # Get image format
+            format, ext = get_image_info(input_image)
+            for profile in profiles:
+                check_format_support(profile.format or format)
+            peak_bytes = max(peak_bytes, estimate_peak_bytes(input_image, profiles, max_decode_bytes))
+
+        budget_bytes = args.memory_budget_mb * 1024 * 1024 if args.memory_budget_mb else None
+        workers = min(safe_worker_count(args.workers, peak_bytes, budget_bytes), len(args.input_images))
+        if workers < args.workers:
+            print(f"Using {workers} worker(s) to stay within the memory budget "
+                  f"(~{peak_bytes / (1024 * 1024):.0f} MB peak per image)")
+
+        # np-* methods resize same-sized inputs together, so workers get groups of inputs
+        batch_size = 1
+        if any(method in NUMPY_METHODS for method in args.methods):
+            batch_size = min(NUMPY_BATCH_SIZE, math.ceil(len(args.input_images) / workers))
+            if budget_bytes is not None:
+                # A worker holds every decoded source of its group at once
+                batch_size = max(1, min(batch_size, budget_bytes // (workers * max(peak_bytes, 1))))
+        jobs = [(args.input_images[i:i + batch_size], args.methods, profiles, args.profiles is not None,
+                 max_decode_bytes, args.output_dir)
+                for i in range(0, len(args.input_images), batch_size)]
+        if workers > 1:
+            pool = mp.Pool(workers, initializer=_init_worker, initargs=(args.cache_dir, cache_max_bytes))
+            results = pool.imap(_process_batch_job, jobs)
+        else:
+            pool = None
+            _init_worker(args.cache_dir, cache_max_bytes)
+            results = map(_process_batch_job, jobs)
+
+        hits = misses = failures = 0
+        try:
+            for batch_results, job_hits, job_misses in results:
+                hits += job_hits
+                misses += job_misses
+                for input_path, outputs, error in batch_results:
+                    print(f"\nInput image: {input_path}")
+                    if error is not None:
+                        print(f"Error: {error}", file=sys.stderr)
+                        failures += 1
+                        continue
+                    for method, output_path in outputs:
+                        print(f"Saved {method} resized image to: {output_path}")
+                        # Print output image info
+                        with Image.open(output_path) as img:
+                            print(f"Output dimensions: {img.size}")
+                            print(f"Output format: {img.format}")
+                        print(f"Output size: {os.path.getsize(output_path)} bytes")
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        if args.cache_dir:
+            lookups = hits + misses
+            rate = hits / lookups if lookups else 0.0
+            print(f"\nCache: {hits} hits, {misses} misses ({rate:.0%} hit rate)")
+        if failures:
+            sys.exit(1)
+
     except Exception as e:
         print(f"Error: {str(e)}", file=sys.stderr)
         sys.exit(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
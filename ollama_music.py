@@ -1,36 +1,408 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import requests
 
 OLLAMA_HOST = 'http://localhost:11434'  # Adjust if your Ollama server is running elsewhere
 MODEL = 'gemma3:4b'
 
-def query_ollama(prompt):
-    url = f"{OLLAMA_HOST}/api/chat"
+# One session for all requests, so the TCP connection to Ollama is reused
+SESSION = requests.Session()
+# Sessions of the batch runner threads, one per thread since sessions are not thread-safe
+_thread_state = threading.local()
+
+class ResponseCache:
+    """
+    On-disk cache of Ollama responses keyed by (model, messages, options).
+
+    Entries live in memory in least-recently-used order, so a hit is a hash and a dict lookup,
+    and are read from and written to a JSON file by load() and save(). Entries older than ttl seconds count as misses and
+    are dropped; beyond max_entries the least recently used entries are evicted. With
+    normalize=True, message texts differing only in case and whitespace share an entry.
+    Safe to use from several threads.
+    """
+    FORMAT = 'ollama-response-cache/1'
+
+    def __init__(self, path=None, ttl=7 * 24 * 3600, max_entries=1000, normalize=False):
+        if ttl <= 0 or max_entries < 1:
+            raise ValueError("ttl and max_entries must be positive")
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.normalize = normalize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.expired = self.evictions = 0
+
+    def key(self, model, messages, options=None):
+        """Hash of the request; with normalize, message contents are lowercased and whitespace collapsed."""
+        if self.normalize:
+            messages = [dict(message, content=' '.join(message.get('content', '').lower().split()))
+                        for message in messages]
+        text = json.dumps([model, messages, options or {}], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, model, messages, options=None):
+        """Return a copy of the cached response, or None on a miss."""
+        key = self.key(model, messages, options)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.time() - entry[0] > self.ttl:
+                del self.entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            result = entry[1]
+        return dict(result, message=dict(result.get('message', {})))
+
+    def put(self, model, messages, options, result):
+        """Store a response, without its timings, evicting the least recently used entries if full."""
+        result = {name: value for name, value in result.items()
+                  if name not in ('time_to_first_token', 'total_time', 'cached')}
+        key = self.key(model, messages, options)
+        with self.lock:
+            self.entries[key] = (time.time(), result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        """Hit and miss counts since the cache was created."""
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'expired': self.expired, 'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0, 'entries': len(self.entries)}
+
+    def load(self):
+        """Read the cache file, keeping only entries that have not expired."""
+        with open(self.path, encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get('format') != self.FORMAT:
+            raise ValueError(f"'{self.path}' is not a response cache")
+        now = time.time()
+        with self.lock:
+            self.entries = OrderedDict((key, (created, result)) for key, created, result in data['entries']
+                                       if now - created <= self.ttl)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def save(self):
+        """Write the cache file atomically, least recently used entries first."""
+        with self.lock:
+            entries = [[key, created, result] for key, (created, result) in self.entries.items()]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': self.FORMAT, 'entries': entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+def query_ollama(prompt, stream=False, on_token=None, model=None, host=None, session=None,
+                 keep_alive=None, options=None, cache=None):
+    """
+    Send a prompt to Ollama's /api/chat endpoint and return the response.
+
+    With stream=True the NDJSON token stream is read as it arrives and on_token(text) is called
+    for every piece of the answer, so it can be printed before generation has finished. A stream
+    that ends before the final 'done' chunk raises RuntimeError, like an error reply.
+    keep_alive (e.g. "10m") tells Ollama how long to keep the model loaded afterwards, and
+    options are model parameters such as {"temperature": 0}. With a ResponseCache, a cached answer
+    is returned (and passed to on_token in one piece) without contacting the server.
+
+    Returns:
+        dict: Ollama's final response with the whole answer in result['message']['content'],
+        plus 'time_to_first_token' and 'total_time' in seconds (equal when not streaming)
+        and 'cached'.
+    """
+    model = model or MODEL
+    messages = [
+        {"role": "user", "content": prompt}
+    ]
+    start = time.perf_counter()
+    if cache is not None:
+        result = cache.get(model, messages, options)
+        if result is not None:
+            if stream and on_token:
+                on_token(result['message'].get('content', ''))
+            result['time_to_first_token'] = result['total_time'] = time.perf_counter() - start
+            result['cached'] = True
+            return result
+
+    url = f"{host or OLLAMA_HOST}/api/chat"
     headers = {'Content-Type': 'application/json'}
     payload = {
-        "model": MODEL,
-        "messages": [
-            {"role": "user", "content": prompt}
-        ]
+        "model": model,
+        "messages": messages,
+        "stream": stream
     }
+    if keep_alive is not None:
+        payload['keep_alive'] = keep_alive
+    if options:
+        payload['options'] = options
+
+    session = session or SESSION
+    if not stream:
+        response = session.post(url, json=payload, headers=headers)
+        response.raise_for_status()
+        result = response.json()
+        result['time_to_first_token'] = result['total_time'] = time.perf_counter() - start
+    else:
+        first_token = None
+        parts = []
+        result = {}
+        with session.post(url, json=payload, headers=headers, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if 'error' in chunk:
+                    raise RuntimeError(f"Ollama error: {chunk['error']}")
+                token = chunk.get('message', {}).get('content', '')
+                if token:
+                    if first_token is None:
+                        first_token = time.perf_counter() - start
+                    parts.append(token)
+                    if on_token:
+                        on_token(token)
+                # Keep reading past the final chunk: leaving the stream early closes the connection
+                if chunk.get('done'):
+                    result = chunk
+        if not result.get('done'):
+            raise RuntimeError("Ollama stream ended before the final 'done' chunk")
+        total = time.perf_counter() - start
+        result['message'] = {'role': 'assistant', 'content': ''.join(parts)}
+        result['time_to_first_token'] = first_token if first_token is not None else total
+        result['total_time'] = total
+    result['cached'] = False
+    if cache is not None and result.get('done') is True:
+        cache.put(model, messages, options, result)
+    return result
 
-    response = requests.post(url, json=payload, headers=headers)
-    response.raise_for_status()
-    return response.json()
+def read_prompts(filename):
+    """
+    Read prompts from a JSONL file, one JSON object per line.
+
+    The prompt is taken from 'prompt', or built from 'title' and 'body' (the format of a
+    requests.jsonl backlog). The id is taken from 'id' or 'request_id', or is the line number.
+
+    Returns:
+        list[dict]: [{'id': ..., 'prompt': ...}, ...]
+    """
+    prompts = []
+    with open(filename, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{filename}:{number}: invalid JSON: {e}")
+            prompt = item.get('prompt') or "\n\n".join(filter(None, [item.get('title'), item.get('body')]))
+            if not prompt:
+                raise ValueError(f"{filename}:{number}: no 'prompt' or 'title'/'body' field")
+            prompts.append({'id': str(item.get('id', item.get('request_id', number))), 'prompt': prompt})
+    return prompts
+
+def run_prompt(item, model, host=None, stream=True, keep_alive=None, options=None, cache=None):
+    """Query one batch prompt and return its record: response, timings and token counts, or the error."""
+    session = getattr(_thread_state, 'session', None)
+    if session is None:
+        session = _thread_state.session = requests.Session()
+    record = {'id': item['id'], 'model': model, 'prompt': item['prompt'], 'response': None, 'ok': False,
+              'error': None, 'prompt_tokens': None, 'output_tokens': None, 'time_to_first_token': None,
+              'total_time': None, 'tokens_per_second': None, 'cached': False}
+    start = time.perf_counter()
+    try:
+        result = query_ollama(item['prompt'], stream=stream, model=model, host=host, session=session,
+                              keep_alive=keep_alive, options=options, cache=cache)
+    except (requests.RequestException, ValueError, RuntimeError) as e:
+        record['error'] = str(e)
+        record['total_time'] = time.perf_counter() - start
+        return record
+    output_tokens = result.get('eval_count')
+    # Generation rate as measured by Ollama, else output tokens over the whole request
+    if output_tokens and result.get('eval_duration'):
+        rate = output_tokens / (result['eval_duration'] / 1e9)
+    elif output_tokens:
+        rate = output_tokens / result['total_time']
+    else:
+        rate = None
+    record.update(response=result.get('message', {}).get('content', ''), ok=True,
+                  prompt_tokens=result.get('prompt_eval_count'), output_tokens=output_tokens,
+                  time_to_first_token=result['time_to_first_token'], total_time=result['total_time'],
+                  tokens_per_second=rate, cached=result['cached'])
+    return record
+
+def run_batch(prompts, models=(MODEL,), concurrency=4, host=None, stream=True, keep_alive=None, options=None,
+              cache=None):
+    """
+    Send every prompt to every model, concurrency requests at a time, one model after the other.
+
+    Each worker thread keeps its own session, so connections are reused across its requests.
+    Ollama serves requests in parallel only up to its OLLAMA_NUM_PARALLEL setting. With a
+    ResponseCache, prompts answered before are not sent again.
+
+    Returns:
+        list[dict]: Records from run_prompt, in input order per model, each with 'batch_seconds'
+        set to the wall time of its model's whole batch.
+    """
+    records = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for model in models:
+            start = time.perf_counter()
+            model_records = list(executor.map(
+                lambda item: run_prompt(item, model, host, stream, keep_alive, options, cache), prompts))
+            elapsed = time.perf_counter() - start
+            for record in model_records:
+                record['batch_seconds'] = elapsed
+            records.extend(model_records)
+    return records
+
+def write_batch_stats(records, output):
+    """Write batch records to a Parquet file."""
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    df = pd.DataFrame(records)
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), output)
+
+def print_batch_summary(records):
+    """Print throughput and latency per model."""
+    for model in dict.fromkeys(record['model'] for record in records):
+        model_records = [record for record in records if record['model'] == model]
+        done = [record for record in model_records if record['ok']]
+        elapsed = model_records[0]['batch_seconds']
+        cached = sum(record['cached'] for record in done)
+        print(f"{model}: {len(done)}/{len(model_records)} ok ({cached} cached) in {elapsed:.2f}s "
+              f"({len(done) / elapsed:.2f} requests/s", end='')
+        if not done:
+            print(")")
+            continue
+        tokens = sum(record['output_tokens'] or 0 for record in done)
+        latencies = sorted(record['total_time'] for record in done)
+        first_tokens = sorted(record['time_to_first_token'] for record in done)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f", {tokens / elapsed:.1f} output tokens/s), latency median {latencies[len(latencies) // 2]:.2f}s "
+              f"p95 {p95:.2f}s, first token median {first_tokens[len(first_tokens) // 2]:.2f}s")
+
+def print_token(token):
+    print(token, end='', flush=True)
 
 def main():
+    parser = argparse.ArgumentParser(description="Ask an Ollama model about classical composers, or run a batch of prompts.")
+    parser.add_argument('--model', type=str, default=MODEL,
+                        help=f"Ollama model; with --batch a comma-separated list to compare (default: {MODEL})")
+    parser.add_argument('--host', type=str, default=OLLAMA_HOST,
+                        help=f"Ollama server URL (default: {OLLAMA_HOST})")
+    parser.add_argument('--no-stream', action='store_true',
+                        help="Wait for the whole answer instead of printing tokens as they arrive")
+    parser.add_argument('--batch', type=str, metavar='PROMPTS.jsonl', default=None,
+                        help="Send every prompt of a JSONL file (fields 'prompt' or 'title'/'body') and record stats")
+    parser.add_argument('--output', type=str, default='ollama_batch.parquet',
+                        help="Parquet file for --batch responses and stats (default: ollama_batch.parquet)")
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help="With --batch, requests in flight at once (default: 4)")
+    parser.add_argument('--keep-alive', type=str, default=None,
+                        help="How long Ollama keeps the model loaded after a request, e.g. 10m or -1 (default: server setting)")
+    parser.add_argument('--cache', type=str, metavar='FILE', default=None,
+                        help="Answer repeated prompts from a response cache kept in FILE")
+    parser.add_argument('--cache-ttl', type=float, default=7 * 24 * 3600,
+                        help="Seconds before a cached response expires (default: 604800, one week)")
+    parser.add_argument('--cache-size', type=int, default=1000,
+                        help="Cached responses kept, least recently used dropped first (default: 1000)")
+    parser.add_argument('--normalize-prompts', action='store_true',
+                        help="Let prompts that differ only in case and whitespace share cached responses")
+    args = parser.parse_args()
+
+    cache = None
+    if args.cache:
+        try:
+            cache = ResponseCache(args.cache, args.cache_ttl, args.cache_size, args.normalize_prompts)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        try:
+            if os.path.exists(args.cache):
+                cache.load()
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Warning: Ignoring unreadable cache '{args.cache}': {e}", file=sys.stderr)
+
+    try:
+        run(args, cache)
+    finally:
+        if cache is not None:
+            stats = cache.stats()
+            print(f"Cache: {stats['hits']} hits, {stats['misses']} misses ({stats['expired']} expired), "
+                  f"{stats['evictions']} evicted, {stats['entries']} entries", file=sys.stderr)
+            try:
+                cache.save()
+            except OSError as e:
+                print(f"Error: Failed to write cache '{args.cache}': {e}", file=sys.stderr)
+
+def run(args, cache):
+    """Run the batch or the single prompt selected by the parsed command-line arguments."""
+    if args.batch:
+        models = [model.strip() for model in args.model.split(',') if model.strip()]
+        if args.concurrency < 1 or not models:
+            print("Error: --concurrency must be positive and --model not empty.", file=sys.stderr)
+            sys.exit(1)
+        try:
+            prompts = read_prompts(args.batch)
+        except (OSError, ValueError) as e:
+            print(f"Error: Failed to read prompts: {e}", file=sys.stderr)
+            sys.exit(1)
+        if not prompts:
+            print(f"Error: No prompts in '{args.batch}'.", file=sys.stderr)
+            sys.exit(1)
+        records = run_batch(prompts, models, args.concurrency, args.host, stream=not args.no_stream,
+                            keep_alive=args.keep_alive, cache=cache)
+        print_batch_summary(records)
+        try:
+            write_batch_stats(records, args.output)
+        except (OSError, ImportError) as e:
+            print(f"Error: Failed to write '{args.output}': {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Results for {len(records)} requests saved to {args.output}")
+        if not any(record['ok'] for record in records):
+            sys.exit(1)
+        return
+
     prompt = (
         "Hey there! As someone who absolutely adores classical music, I’d love "
         "to know your take on the top 10 greatest classical composers of all time. "
         "Could you please list them out with a little note on why they stand out? 🎶"
     )
 
-    result = query_ollama(prompt)
+    print(f"Response from Ollama ({args.model}):\n")
+    try:
+        result = query_ollama(prompt, stream=not args.no_stream, on_token=print_token, model=args.model,
+                              host=args.host, keep_alive=args.keep_alive, cache=cache)
+    except (requests.RequestException, ValueError, RuntimeError) as e:
+        print(f"\nError: Failed to query Ollama at {args.host}: {e}", file=sys.stderr)
+        sys.exit(1)
 
-    print("Response from Ollama (gemma3:4b):\n")
-    for message in result.get('messages', []):
-        print(message['content'])
+    if args.no_stream:
+        print(result.get('message', {}).get('content', ''))
+    else:
+        print()
+    if result['cached']:
+        print(f"\nAnswered from cache in {result['total_time'] * 1e6:.0f} µs", file=sys.stderr)
+        return
+    print(f"\nFirst token after {result['time_to_first_token']:.2f}s, "
+          f"full answer after {result['total_time']:.2f}s", file=sys.stderr)
 
 if __name__ == "__main__":
     main()
-
-
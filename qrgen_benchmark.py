@@ -0,0 +1,262 @@
+"""
+qrgen_benchmark.py
+
+Benchmark qrgen_for3dprint.py across QR versions, box sizes and output modes.
+
+Features:
+- Runs SVG, STEP and mesh output (optionally with the cylinder base) for fixed QR versions and box sizes.
+- Runs every case in a fresh child process, so wall time, library import time and peak memory (max RSS)
+  are measured per case and are not skewed by earlier cases or warm caches.
+- Records the output file size and writes everything to a JSON report.
+- Compares against a previous report and exits non-zero on time regressions, for use in CI or before batch jobs.
+
+Author: (your name)
+"""
+
+import sys
+import os
+import json
+import time
+import platform
+import argparse
+import itertools
+import subprocess
+import tempfile
+
+# Short payload that fits QR version 1, so every version can be benchmarked with the same data
+PAYLOAD = "https://a.io"
+
+# Output modes: file extension, library to import and extra generator arguments
+OUTPUT_MODES = {
+    'svg': ('.svg', 'qrcode', {}),
+    'svg-path': ('.svg', 'qrcode', {'mode': 'path'}),
+    'step': ('.step', 'cadquery', {}),
+    'step-outline': ('.step', 'cadquery', {'outline': True}),
+    'step-tiled': ('.step', 'cadquery', {'tiles': 2}),
+    'mesh': ('.stl', 'numpy', {}),
+}
+
+
+def run_case(case):
+    """
+    Generate one benchmark case in the current process and measure it.
+
+    Args:
+        case (dict): {'output', 'cylinder', 'version', 'box_size'}, see OUTPUT_MODES for 'output'.
+
+    Returns:
+        dict: The case plus 'modules', 'import_seconds', 'seconds', 'output_bytes', 'peak_rss_kb', 'ok' and 'error'.
+    """
+    import resource
+    result = dict(case)
+    extension, library, options = OUTPUT_MODES[case['output']]
+    start = time.perf_counter()
+    import qrgen_for3dprint as qrgen
+    __import__(library)
+    result['import_seconds'] = round(time.perf_counter() - start, 4)
+    result['modules'] = sum(map(sum, qrgen.make_qr_matrix(PAYLOAD, version=case['version'])))
+    options = dict(options, box_size=case['box_size'], version=case['version'])
+    if case['cylinder']:
+        options['cylinder'] = True
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_filename = os.path.join(tmp_dir, f"benchmark{extension}")
+        start = time.perf_counter()
+        try:
+            if extension == '.svg':
+                qrgen.generate_fusion360_svg(PAYLOAD, output_filename, **options)
+            elif extension == '.step':
+                qrgen.generate_fusion360_step(PAYLOAD, output_filename, **options)
+            else:
+                qrgen.generate_mesh(PAYLOAD, output_filename, **options)
+            result['seconds'] = round(time.perf_counter() - start, 4)
+            result['output_bytes'] = os.path.getsize(output_filename)
+            result['ok'], result['error'] = True, None
+        except Exception as e:
+            result['seconds'] = round(time.perf_counter() - start, 4)
+            result['output_bytes'] = None
+            result['ok'], result['error'] = False, str(e)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result['peak_rss_kb'] = peak // 1024 if sys.platform == 'darwin' else peak
+    return result
+
+
+def run_case_in_child(case, timeout):
+    """
+    Run one case in a fresh Python process and return its measurements.
+
+    Args:
+        case (dict): The case to run, see run_case.
+        timeout (float): Seconds before the child is killed and the case recorded as failed.
+
+    Returns:
+        dict: The measurements from run_case, plus 'wall_seconds' for the whole child process.
+    """
+    command = [sys.executable, os.path.abspath(__file__), '--run-case', json.dumps(case)]
+    start = time.perf_counter()
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)))
+        lines = completed.stdout.strip().splitlines()
+        if completed.returncode != 0 or not lines:
+            raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else
+                               f"exit code {completed.returncode}")
+        result = json.loads(lines[-1])
+    except (subprocess.TimeoutExpired, RuntimeError, ValueError) as e:
+        result = dict(case, ok=False, error=f"timed out after {timeout}s" if isinstance(e, subprocess.TimeoutExpired) else str(e))
+    result['wall_seconds'] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def build_cases(outputs, versions, box_sizes, cylinder_modes):
+    """
+    List the benchmark cases for every combination of the given settings. SVG output has no cylinder variant.
+
+    Returns:
+        list[dict]: Cases as accepted by run_case.
+    """
+    cases = []
+    for output, cylinder, version, box_size in itertools.product(outputs, cylinder_modes, versions, box_sizes):
+        if cylinder and output.startswith('svg'):
+            continue
+        cases.append({'output': output, 'cylinder': cylinder, 'version': version, 'box_size': box_size})
+    return cases
+
+
+def case_key(result):
+    return (result['output'], result['cylinder'], result['version'], result['box_size'])
+
+
+def find_regressions(results, baseline, tolerance=0.25, min_seconds=0.05):
+    """
+    Compare generation times against a baseline report.
+
+    A case regresses if it takes more than (1 + tolerance) times its baseline time and at least min_seconds longer,
+    so noise on millisecond cases is ignored. Cases missing from the baseline are not compared.
+
+    Args:
+        results (list[dict]): Measurements of the current run.
+        baseline (dict): A report previously written by this script.
+        tolerance (float): Allowed relative slowdown (default: 0.25).
+        min_seconds (float): Allowed absolute slowdown in seconds (default: 0.05).
+
+    Returns:
+        list[tuple[dict, dict]]: (current, baseline) measurement pairs that regressed.
+    """
+    previous = {case_key(result): result for result in baseline.get('cases', []) if result.get('ok')}
+    regressions = []
+    for result in results:
+        old = previous.get(case_key(result))
+        if result.get('ok') and old and result['seconds'] > old['seconds'] * (1 + tolerance) \
+                and result['seconds'] - old['seconds'] >= min_seconds:
+            regressions.append((result, old))
+    return regressions
+
+
+def parse_list(text, convert):
+    return [convert(item) for item in text.split(',') if item.strip()]
+
+
+def main():
+    """
+    Main function to parse command-line arguments, run the benchmark cases and write the report.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark qrgen_for3dprint.py across QR versions, box sizes and output modes.",
+        epilog="Example: python qrgen_benchmark.py --outputs svg,step,mesh --versions 1,10,20 --report qrgen_benchmark.json"
+    )
+    parser.add_argument('--outputs', type=str, default='svg,svg-path,step,step-outline,mesh',
+                        help=f"Comma-separated output modes out of {', '.join(OUTPUT_MODES)} (default: all except step-tiled)")
+    parser.add_argument('--versions', type=str, default='1,5,10,20',
+                        help="Comma-separated QR versions 1-40 (default: 1,5,10,20)")
+    parser.add_argument('--box-sizes', type=str, default='1,10',
+                        help="Comma-separated module sizes in mm or SVG units (default: 1,10)")
+    parser.add_argument('--cylinder', choices=['both', 'on', 'off'], default='both',
+                        help="Run STEP and mesh cases with the cylinder base, without it, or both (default: both)")
+    parser.add_argument('--timeout', type=float, default=600,
+                        help="Seconds before a case is killed and recorded as failed (default: 600)")
+    parser.add_argument('--report', type=str, default='qrgen_benchmark.json',
+                        help="JSON report to write (default: qrgen_benchmark.json)")
+    parser.add_argument('--baseline', type=str, default=None,
+                        help="Earlier report to compare against; exit with status 1 on time regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed relative slowdown against --baseline (default: 0.25)")
+    parser.add_argument('--run-case', type=str, default=None, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return
+
+    try:
+        outputs = parse_list(args.outputs, str)
+        unknown = [output for output in outputs if output not in OUTPUT_MODES]
+        if unknown:
+            raise ValueError(f"Unknown output modes: {', '.join(unknown)}")
+        versions = parse_list(args.versions, int)
+        if any(not 1 <= version <= 40 for version in versions):
+            raise ValueError("QR versions must be between 1 and 40")
+        box_sizes = parse_list(args.box_sizes, float)
+    except ValueError as err:
+        print(f"Error: {err}")
+        sys.exit(1)
+    cylinder_modes = {'both': [False, True], 'on': [True], 'off': [False]}[args.cylinder]
+    cases = build_cases(outputs, versions, box_sizes, cylinder_modes)
+
+    print(f"\n--- qrgen Benchmark ({len(cases)} cases) ---\n")
+    print(f"{'output':<13}{'cyl':<5}{'ver':>4}{'box':>6}{'modules':>9}{'import s':>10}{'gen s':>9}{'peak MB':>9}{'bytes':>11}")
+    results = []
+    for case in cases:
+        result = run_case_in_child(case, args.timeout)
+        results.append(result)
+        if result['ok']:
+            print(f"{result['output']:<13}{'yes' if result['cylinder'] else 'no':<5}{result['version']:>4}"
+                  f"{result['box_size']:>6g}{result['modules']:>9}{result['import_seconds']:>10.3f}"
+                  f"{result['seconds']:>9.3f}{result['peak_rss_kb'] / 1024:>9.1f}{result['output_bytes']:>11}")
+        else:
+            print(f"{result['output']:<13}{'yes' if result['cylinder'] else 'no':<5}{result['version']:>4}"
+                  f"{result['box_size']:>6g}  failed: {result['error']}")
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'payload': PAYLOAD,
+        'cases': results,
+    }
+    try:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    except OSError as err:
+        print(f"Error: Failed to write report '{args.report}': {err}")
+        sys.exit(1)
+    print(f"\nReport written to {args.report}")
+
+    failures = sum(not result['ok'] for result in results)
+    if failures:
+        print(f"{failures} of {len(results)} cases failed.")
+
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as err:
+            print(f"Error: Failed to read baseline '{args.baseline}': {err}")
+            sys.exit(1)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for result, old in regressions:
+            print(f"Regression: {result['output']} cylinder={result['cylinder']} version={result['version']} "
+                  f"box_size={result['box_size']:g}: {old['seconds']:.3f}s -> {result['seconds']:.3f}s")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
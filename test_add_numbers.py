@@ -1,6 +1,15 @@
 import unittest
 import sys
-from add_numbers import add_numbers, parse_input
+import io
+import os
+import random
+import subprocess
+from contextlib import redirect_stdout
+from unittest import mock
+import numpy as np
+from add_numbers import (add_numbers, parse_input, add_two_numbers, add_two_numbers_limbs, add_limbs,
+                         digits_to_limbs, limbs_to_digits, list_to_linked, linked_to_list, LIMB_BASE,
+                         add_numbers_batch, add_number_stream, parse_pairs, run_batch)
 
 class TestAddNumbers(unittest.TestCase):
     def test_add_integers(self):
@@ -29,6 +38,14 @@ class TestAddNumbers(unittest.TestCase):
         self.assertRaises(TypeError, add_numbers, None, 3)
         self.assertRaises(TypeError, add_numbers, 5, None)
 
+    def test_cli_runs_without_numpy(self):
+        # Blocking the numpy import makes any use of it on the scalar path fail
+        code = "import sys; sys.modules['numpy'] = None; sys.argv = ['add_numbers.py', '3', '5']; " \
+               "import add_numbers; add_numbers.main()"
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        self.assertEqual(output, "3.0 + 5.0 = 8.0\n")
+
 class TestParseInput(unittest.TestCase):
     def test_valid_input(self):
         self.assertEqual(parse_input("5"), 5.0)
@@ -40,5 +57,111 @@ class TestParseInput(unittest.TestCase):
         self.assertRaises(ValueError, parse_input, "")
         self.assertRaises(ValueError, parse_input, "1.2.3")
 
+def digits_to_int(digits):
+    return int(''.join(map(str, digits[::-1])))
+
+class TestLimbAddition(unittest.TestCase):
+    def test_matches_python_integers(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            a = [rng.randint(0, 9) for _ in range(rng.randint(1, 60))]
+            b = [rng.randint(0, 9) for _ in range(rng.randint(1, 60))]
+            total = limbs_to_digits(add_limbs(digits_to_limbs(a), digits_to_limbs(b))).tolist()
+            self.assertEqual(digits_to_int(total), digits_to_int(a) + digits_to_int(b))
+
+    def test_carry_ripples_through_full_limbs(self):
+        nines = np.full(1000, LIMB_BASE - 1, dtype=np.uint64)
+        total = add_limbs(nines, np.array([1], dtype=np.uint64))
+        self.assertEqual(total.size, 1001)
+        self.assertEqual(int(total[-1]), 1)
+        self.assertFalse(total[:-1].any())
+
+    def test_linked_list_round_trip(self):
+        examples = [([2, 4, 3], [5, 6, 4]), ([0], [0]), ([9, 9, 9, 9, 9, 9, 9], [9, 9, 9, 9]), ([1] * 40, [9] * 19)]
+        for a, b in examples:
+            expected = linked_to_list(add_two_numbers(list_to_linked(a), list_to_linked(b)))
+            self.assertEqual(linked_to_list(add_two_numbers_limbs(list_to_linked(a), list_to_linked(b))), expected)
+
+    def test_linked_list_edge_cases_match_add_two_numbers(self):
+        examples = [([0, 0], [0]), ([], [0, 0, 0]), ([0] * 20, [1]), ([5], []), ([9] * 36, [1])]
+        for a, b in examples:
+            expected = linked_to_list(add_two_numbers(list_to_linked(a), list_to_linked(b)))
+            self.assertEqual(linked_to_list(add_two_numbers_limbs(list_to_linked(a), list_to_linked(b))), expected)
+        self.assertIsNone(add_two_numbers_limbs(None, None))
+
+    def test_empty_limbs(self):
+        empty = np.array([], dtype=np.uint64)
+        self.assertEqual(add_limbs(empty, empty).size, 0)
+        self.assertEqual(add_limbs(empty, np.array([7], dtype=np.uint64)).tolist(), [7])
+
+    def test_invalid_digits(self):
+        self.assertRaises(ValueError, digits_to_limbs, [1, 10])
+        self.assertRaises(ValueError, digits_to_limbs, [-1])
+        self.assertRaises(ValueError, add_two_numbers_limbs, list_to_linked([1, 300]), list_to_linked([1]))
+
+class TestAddNumbersBatch(unittest.TestCase):
+    def test_matches_scalar_add_numbers(self):
+        max_float = sys.float_info.max
+        a = [5, -2.5, 0.1, "5", None, max_float, float('inf'), 10 ** 400, True, 3 + 0j]
+        b = [3, 3.7, 0.2, 3, 5, max_float, 1, 1, 2, 1]
+        result, errors = add_numbers_batch(a, b)
+        for i, (x, y) in enumerate(zip(a, b)):
+            try:
+                expected = add_numbers(x, y)
+            except (TypeError, OverflowError):
+                self.assertTrue(errors[i], (x, y))
+                self.assertTrue(np.isnan(result[i]))
+            else:
+                self.assertFalse(errors[i], (x, y))
+                self.assertEqual(result[i], expected)
+
+    def test_numeric_arrays(self):
+        a = np.arange(1000, dtype=np.int64)
+        b = np.linspace(0, 1, 1000)
+        result, errors = add_numbers_batch(a, b)
+        np.testing.assert_array_equal(result, a + b)
+        self.assertFalse(errors.any())
+        result, errors = add_numbers_batch(np.array([sys.float_info.max, 1.0]), np.array([sys.float_info.max, 1.0]))
+        self.assertEqual(errors.tolist(), [True, False])
+        _, errors = add_numbers_batch(np.array(["1", "2"]), np.array([1, 2]))
+        self.assertTrue(errors.all())
+        self.assertRaises(ValueError, add_numbers_batch, [1, 2], [1])
+
+    def test_parse_pairs(self):
+        a, b, invalid = parse_pairs(["3 5\n", "2.5,4\n", " -1 , 2 \n"])
+        self.assertEqual((a.tolist(), b.tolist(), invalid.tolist()), ([3, 2.5, -1], [5, 4, 2], [False] * 3))
+        a, b, invalid = parse_pairs(["3 5\n", "7\n", "abc 1\n", "1 2 3\n", "4\t6"])
+        self.assertEqual(invalid.tolist(), [False, True, True, True, False])
+        self.assertEqual((a[4], b[4]), (4, 6))
+
+    def test_parse_pairs_rejects_stray_commas(self):
+        lines = ["1,,2\n", ",1 2\n", "1 2,\n", "1,2,\n", "1, 2\n", "3 4\n"]
+        a, b, invalid = parse_pairs(lines)
+        self.assertEqual(invalid.tolist(), [True, True, True, True, False, False])
+        self.assertEqual((a[4:].tolist(), b[4:].tolist()), ([1, 3], [2, 4]))
+
+    def test_parse_pairs_other_whitespace_matches_line_by_line_parse(self):
+        # NumPy's parser splits on form feeds and similar characters, the line pattern does not
+        for lines in (["1,2\n", "3\x0c4\n"], ["1 2\n", "3\x1c4\n"], ["5\u20036\n"], ["1\r2\n"]):
+            a, b, invalid = parse_pairs(lines)
+            self.assertEqual(len(invalid), len(lines))
+            self.assertTrue(invalid[-1], lines)
+            self.assertFalse(invalid[:-1].any(), lines)
+        a, b, invalid = parse_pairs(["1 2\r\n", "3,4\r"])
+        self.assertEqual((a.tolist(), b.tolist(), invalid.tolist()), ([1, 3], [2, 4], [False, False]))
+
+    def test_stream_chunks_and_output(self):
+        lines = [f"{i} {i}\n" for i in range(10)] + ["\n", "x 1\n", "1e308 1e308\n"]
+        chunks = list(add_number_stream(lines, chunk_size=4))
+        self.assertEqual(len(chunks), 3)
+        result = np.concatenate([chunk[0] for chunk in chunks])
+        errors = np.concatenate([chunk[1] for chunk in chunks])
+        self.assertEqual(result[:10].tolist(), [2.0 * i for i in range(10)])
+        self.assertEqual(errors.tolist(), [False] * 10 + [True, True])
+        output = io.StringIO()
+        with mock.patch('sys.stdin', io.StringIO("3 5\nabc 1\n")), redirect_stdout(output):
+            self.assertEqual(run_batch('-'), (2, 1))
+        self.assertEqual(output.getvalue(), "8.0\nerror\n")
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,193 @@
+import unittest
+import io
+import os
+import struct
+import sys
+import tempfile
+import multiprocessing as mp
+from unittest import mock
+import numpy as np
+from PIL import Image
+import image_resizer
+from image_resizer import (Profile, DEFAULT_PROFILE, ThumbnailCache, parse_profile, encoder_options,
+                           numpy_resize, numpy_resize_batch, resize_batch, resize_to_profiles, process_batch,
+                           compute_target_size, load_within_budget, serve)
+
+def noise_image(size, mode='RGB'):
+    return Image.effect_noise(size, 64).convert(mode)
+
+class TestProfiles(unittest.TestCase):
+    def test_parse_profile(self):
+        self.assertEqual(parse_profile('320x240:webp:70'), Profile(320, 240, 'WEBP', 70))
+        self.assertEqual(parse_profile('1280X960:jpg'), Profile(1280, 960, 'JPEG'))
+        for spec in ('320', '0x240', '320x240:webp:101', 'a:b:c:d'):
+            with self.assertRaises(ValueError):
+                parse_profile(spec)
+
+    def test_default_profile_keeps_quality_95(self):
+        self.assertEqual(encoder_options('JPEG', DEFAULT_PROFILE.quality, DEFAULT_PROFILE.tuned), {'quality': 95})
+        self.assertEqual(encoder_options('JPEG'), {'quality': 85, 'optimize': True, 'progressive': True})
+        self.assertEqual(encoder_options('WEBP', 70)['quality'], 70)
+
+    def test_compute_target_size(self):
+        self.assertEqual(compute_target_size((1600, 1200), 640, 480), (640, 480))
+        self.assertEqual(compute_target_size((1000, 250), 640, 480), (640, 160))
+        self.assertEqual(compute_target_size((10, 4000), 640, 480), (1, 480))
+
+class TestNumpyBackend(unittest.TestCase):
+    def test_matches_pillow_filters(self):
+        img = noise_image((1280, 960))
+        for method, resample in (('np-bilinear', Image.BILINEAR), ('np-area', Image.BOX)):
+            ours = np.asarray(numpy_resize(img, (640, 480), method)).astype(int)
+            pillow = np.asarray(img.resize((640, 480), resample)).astype(int)
+            self.assertLessEqual(np.abs(ours - pillow).max(), 1, method)
+
+    def test_np_bilinear_matches_at_fractional_scale(self):
+        img = noise_image((1600, 1200))
+        ours = np.asarray(numpy_resize(img, (640, 480), 'np-bilinear')).astype(int)
+        pillow = np.asarray(img.resize((640, 480), Image.BILINEAR)).astype(int)
+        self.assertLessEqual(np.abs(ours - pillow).max(), 1)
+
+    def test_batch_equals_single_images(self):
+        images = [noise_image((200, 150)) for _ in range(3)]
+        batch = numpy_resize_batch(np.stack([np.asarray(img) for img in images]), (64, 48), 'np-area')
+        self.assertEqual(batch.shape, (3, 48, 64, 3))
+        for img, resized in zip(images, batch):
+            np.testing.assert_array_equal(np.asarray(numpy_resize(img, (64, 48), 'np-area')), resized)
+
+    def test_grayscale_and_alpha(self):
+        for mode in ('L', 'RGBA', 'P'):
+            resized = numpy_resize(noise_image((100, 80), mode), (50, 40), 'np-bilinear')
+            self.assertEqual(resized.size, (50, 40))
+            self.assertEqual(resized.mode, 'RGB' if mode == 'P' else mode)
+
+class TestBatchResize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.paths = []
+        for i, size in enumerate([(320, 240), (320, 240), (300, 300), (320, 240)]):
+            path = os.path.join(self.dir, f"in{i}.png")
+            noise_image(size).save(path)
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_resize_batch_groups_same_sized_inputs(self):
+        profiles = [Profile(160, 120), Profile(80, 60, 'JPEG')]
+        jobs = [(path, [(p, os.path.join(self.dir, f"out{i}_{p.width}.{(p.format or 'png').lower()}"))
+                        for p in profiles])
+                for i, path in enumerate(self.paths)]
+        calls = []
+        real = image_resizer.numpy_resize_batch
+
+        def counting(batch, size, method):
+            calls.append((batch.shape[0], size))
+            return real(batch, size, method)
+
+        with mock.patch.object(image_resizer, 'numpy_resize_batch', counting):
+            errors = resize_batch(jobs, 'np-area')
+        self.assertEqual(errors, [None] * 4)
+        # Three 320x240 inputs per target size, then the square one on its own
+        self.assertEqual(sorted(calls), sorted([(3, (160, 120)), (3, (80, 60)), (1, (120, 120)), (1, (60, 60))]))
+        for path, targets in jobs:
+            with Image.open(path) as img:
+                expected = numpy_resize(img, compute_target_size(img.size, 160, 120), 'np-area')
+            with Image.open(targets[0][1]) as out:
+                np.testing.assert_array_equal(np.asarray(out), np.asarray(expected))
+            with Image.open(targets[1][1]) as out:
+                self.assertEqual(out.format, 'JPEG')
+
+    def test_process_batch_reports_errors_per_input(self):
+        broken = os.path.join(self.dir, "broken.png")
+        with open(broken, 'wb') as f:
+            f.write(b"not an image")
+        inputs = [self.paths[0], broken, os.path.join(self.dir, "missing.png"), self.paths[1]]
+        results = process_batch(inputs, ['np-bilinear', 'bilinear'], [DEFAULT_PROFILE], False)
+        self.assertEqual([input_path for input_path, _, _ in results], inputs)
+        self.assertEqual([error is None for _, _, error in results], [True, False, False, True])
+        self.assertIn("not found", results[2][2])
+        self.assertEqual([method for method, _ in results[0][1]], ['np-bilinear', 'bilinear'])
+        for _, output_path in results[0][1] + results[3][1]:
+            with Image.open(output_path) as img:
+                self.assertEqual(img.size, (640, 480))
+
+    def test_cache_hits_skip_resizing(self):
+        cache = ThumbnailCache(os.path.join(self.dir, "cache"))
+        targets = [(Profile(64, 48), os.path.join(self.dir, "a.png"))]
+        resize_batch([(self.paths[0], targets)], 'np-area', cache)
+        targets = [(Profile(64, 48), os.path.join(self.dir, "b.png"))]
+        with mock.patch.object(image_resizer, 'numpy_resize_batch') as resize:
+            self.assertEqual(resize_batch([(self.paths[1], targets), (self.paths[0], targets)], 'np-area', cache),
+                             [None, None])
+        self.assertEqual(resize.call_count, 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+class TestMemoryBound(unittest.TestCase):
+    def test_jpeg_draft_and_bmp_strips(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            jpeg = os.path.join(tmp_dir, "big.jpg")
+            bmp = os.path.join(tmp_dir, "big.bmp")
+            noise_image((2560, 1920)).save(jpeg)
+            noise_image((2560, 1920)).save(bmp)
+            budget = 2 * 1024 * 1024
+            with Image.open(jpeg) as img:
+                self.assertEqual(load_within_budget(img, jpeg, (320, 240), budget).size, (640, 480))
+            with Image.open(bmp) as img:
+                self.assertEqual(load_within_budget(img, bmp, (320, 240), budget).size, (640, 480))
+            with Image.open(bmp) as img:
+                with self.assertRaises(MemoryError):
+                    load_within_budget(img, bmp, (2560, 1920), budget)
+            output = os.path.join(tmp_dir, "out.bmp")
+            resize_to_profiles(bmp, 'bilinear', [(Profile(320, 240), output)], max_decode_bytes=budget)
+            with Image.open(output) as img:
+                self.assertEqual(img.size, (320, 240))
+
+class _CountingStdin(io.RawIOBase):
+    """Binary stdin that counts the frame headers read so far."""
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+        self.frames = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        data = self.data.read(size)
+        if size == 4 and data:
+            self.frames += 1
+        return data
+
+class TestServe(unittest.TestCase):
+    def test_frames_are_read_a_bounded_distance_ahead(self):
+        buffer = io.BytesIO()
+        noise_image((40, 30)).save(buffer, 'PNG')
+        frame = struct.pack('>I', len(buffer.getvalue())) + buffer.getvalue()
+        stdin = _CountingStdin(frame * 200)
+        ahead = []
+
+        class Stdout(io.BytesIO):
+            def flush(self):
+                ahead.append(stdin.frames - len(ahead) - 1)
+
+        stdout = Stdout()
+        pool = mp.get_context('fork').Pool(2)
+        try:
+            with mock.patch.object(sys, 'stdin', mock.Mock(buffer=stdin)), \
+                 mock.patch.object(sys, 'stdout', mock.Mock(buffer=stdout)):
+                serve('frames', pool, ['bilinear'], [Profile(16, 12)], True, None, None, workers=2)
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual(len(ahead), 200)
+        self.assertLessEqual(max(ahead), image_resizer.SERVE_JOBS_PER_WORKER * 2)
+
+        data = io.BytesIO(stdout.getvalue())
+        (count,) = struct.unpack('>I', data.read(4))
+        (length,) = struct.unpack('>I', data.read(4))
+        with Image.open(io.BytesIO(data.read(length))) as img:
+            self.assertEqual((count, img.size), (1, (16, 12)))
+
+if __name__ == '__main__':
+    unittest.main()
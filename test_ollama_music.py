@@ -0,0 +1,251 @@
+import unittest
+import os
+import json
+import time
+import tempfile
+import threading
+import requests
+import pyarrow.parquet as pq
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import ollama_music
+from ollama_music import ResponseCache
+
+TOKENS = ["Bach", ", ", "Mozart", ", ", "Beethoven"]
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    """
+    Mock of Ollama's /api/chat: one JSON reply, or NDJSON chunks 50 ms apart when streaming.
+    Model "missing" gets a 404 like an unknown model, model "truncated" a stream that ends before the
+    final 'done' chunk and model "dropped" one whose connection closes mid-stream. Requests and peak
+    concurrency are recorded.
+    """
+    protocol_version = 'HTTP/1.1'
+    connections = 0
+    requests = []
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        type(self).connections += 1
+        super().setup()
+
+    def do_POST(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            self.reply()
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def reply(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        type(self).requests.append(request)
+        if self.path != '/api/chat' or request['model'] == 'missing':
+            body = json.dumps({'error': f"model '{request['model']}' not found"}).encode()
+            self.send_response(404)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if not request.get('stream', True):
+            body = json.dumps({'model': request['model'], 'done': True, 'eval_count': len(TOKENS),
+                               'message': {'role': 'assistant', 'content': ''.join(TOKENS)}}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        chunks = [{'model': request['model'], 'done': False, 'message': {'role': 'assistant', 'content': token}}
+                  for token in TOKENS]
+        chunks.append({'model': request['model'], 'done': True, 'eval_count': len(TOKENS),
+                       'eval_duration': 250_000_000, 'prompt_eval_count': 7,
+                       'message': {'role': 'assistant', 'content': ''}})
+        if request['model'] in ('truncated', 'dropped'):
+            chunks = chunks[:2]
+        for chunk in chunks:
+            time.sleep(0.05)
+            data = (json.dumps(chunk) + '\n').encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+        if request['model'] == 'dropped':
+            self.close_connection = True
+            return
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+class TestQueryOllama(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), MockOllamaHandler)
+        cls.server.daemon_threads = True
+        cls.host = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_non_streaming_reuses_connection(self):
+        session = requests.Session()
+        MockOllamaHandler.connections = 0
+        for _ in range(3):
+            result = ollama_music.query_ollama("Composers?", host=self.host, session=session)
+            self.assertEqual(result['message']['content'], ''.join(TOKENS))
+            self.assertEqual(result['time_to_first_token'], result['total_time'])
+        self.assertEqual(MockOllamaHandler.connections, 1)
+
+    def test_streaming_tokens_and_time_to_first_token(self):
+        received = []
+        result = ollama_music.query_ollama("Composers?", stream=True, on_token=received.append,
+                                           host=self.host, session=requests.Session())
+        self.assertEqual(received, TOKENS)
+        self.assertEqual(result['message']['content'], ''.join(TOKENS))
+        self.assertEqual(result['eval_count'], len(TOKENS))
+        self.assertTrue(result['done'])
+        # The first token arrives after one 50 ms chunk, the whole answer after six
+        self.assertLess(result['time_to_first_token'], result['total_time'] / 2)
+        self.assertGreaterEqual(result['total_time'], 0.3)
+
+    def test_truncated_stream_is_an_error(self):
+        with self.assertRaisesRegex(RuntimeError, "before the final 'done' chunk"):
+            ollama_music.query_ollama("Composers?", model='truncated', stream=True, host=self.host,
+                                      session=requests.Session())
+
+    def test_streaming_reuses_connection(self):
+        session = requests.Session()
+        MockOllamaHandler.connections = 0
+        for _ in range(3):
+            result = ollama_music.query_ollama("Composers?", stream=True, host=self.host, session=session)
+            self.assertEqual(result['message']['content'], ''.join(TOKENS))
+        self.assertEqual(MockOllamaHandler.connections, 1)
+
+    def test_batch_runner_writes_parquet_stats(self):
+        prompts = [{'id': f"p{i}", 'prompt': f"Composer number {i}?"} for i in range(6)]
+        MockOllamaHandler.max_active = 0
+        MockOllamaHandler.requests = []
+        start = time.perf_counter()
+        records = ollama_music.run_batch(prompts, ['gemma3:4b', 'missing'], concurrency=3, host=self.host,
+                                         keep_alive='10m')
+        elapsed = time.perf_counter() - start
+        self.assertEqual([record['id'] for record in records], [f"p{i}" for i in range(6)] * 2)
+        good, bad = records[:6], records[6:]
+        self.assertTrue(all(record['ok'] and record['response'] == ''.join(TOKENS) for record in good))
+        self.assertTrue(all(not record['ok'] and '404' in record['error'] for record in bad))
+        self.assertEqual(good[0]['tokens_per_second'], len(TOKENS) / 0.25)
+        self.assertEqual(good[0]['prompt_tokens'], 7)
+        # Six 0.3 s streams, three at a time
+        self.assertEqual(MockOllamaHandler.max_active, 3)
+        self.assertLess(elapsed, 1.5)
+        self.assertTrue(all(request['keep_alive'] == '10m' for request in MockOllamaHandler.requests))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, "stats.parquet")
+            ollama_music.write_batch_stats(records, output)
+            df = pq.read_table(output).to_pandas()
+        self.assertEqual(len(df), 12)
+        self.assertEqual(df.groupby('model')['ok'].sum().to_dict(), {'gemma3:4b': 6, 'missing': 0})
+        for column in ('time_to_first_token', 'total_time', 'tokens_per_second', 'batch_seconds', 'response'):
+            self.assertIn(column, df.columns)
+
+    def test_cached_query_skips_server(self):
+        cache = ResponseCache()
+        MockOllamaHandler.requests = []
+        first = ollama_music.query_ollama("Composers?", host=self.host, session=requests.Session(), cache=cache)
+        received = []
+        second = ollama_music.query_ollama("Composers?", stream=True, on_token=received.append, host=self.host,
+                                           cache=cache)
+        self.assertEqual(len(MockOllamaHandler.requests), 1)
+        self.assertEqual((first['cached'], second['cached']), (False, True))
+        self.assertEqual(received, [''.join(TOKENS)])
+        self.assertLess(second['total_time'], 0.01)
+
+    def test_incomplete_stream_is_not_cached(self):
+        cache = ResponseCache()
+        for model in ('truncated', 'dropped'):
+            with self.assertRaises((RuntimeError, requests.RequestException)):
+                ollama_music.query_ollama("Composers?", model=model, stream=True, host=self.host,
+                                          session=requests.Session(), cache=cache)
+        self.assertEqual(len(cache.entries), 0)
+
+    def test_read_prompts(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "prompts.jsonl")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'id': 'a', 'prompt': 'Who is Bach?'}) + "\n\n")
+                f.write(json.dumps({'request_id': 'user-1', 'title': 'Title', 'body': 'Body'}) + "\n")
+                f.write(json.dumps({'prompt': 'No id'}) + "\n")
+            self.assertEqual(ollama_music.read_prompts(path), [
+                {'id': 'a', 'prompt': 'Who is Bach?'}, {'id': 'user-1', 'prompt': 'Title\n\nBody'},
+                {'id': '4', 'prompt': 'No id'}])
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write("{broken\n")
+            with self.assertRaises(ValueError):
+                ollama_music.read_prompts(path)
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.messages = [{'role': 'user', 'content': 'Who is  Bach?'}]
+        self.result = {'model': 'gemma3:4b', 'done': True, 'message': {'role': 'assistant', 'content': 'A composer.'},
+                       'time_to_first_token': 1.0, 'total_time': 2.0}
+
+    def test_hit_miss_and_key(self):
+        cache = ResponseCache()
+        self.assertIsNone(cache.get('gemma3:4b', self.messages))
+        cache.put('gemma3:4b', self.messages, None, self.result)
+        hit = cache.get('gemma3:4b', self.messages)
+        self.assertEqual(hit['message']['content'], 'A composer.')
+        self.assertNotIn('total_time', hit)
+        hit['message']['content'] = 'changed'
+        self.assertEqual(cache.get('gemma3:4b', self.messages)['message']['content'], 'A composer.')
+        self.assertIsNone(cache.get('llama3.2', self.messages))
+        self.assertIsNone(cache.get('gemma3:4b', self.messages, {'temperature': 0}))
+        self.assertIsNone(cache.get('gemma3:4b', [{'role': 'user', 'content': 'who is bach?'}]))
+        self.assertEqual((cache.stats()['hits'], cache.stats()['misses']), (2, 4))
+
+    def test_normalized_prompts_share_entries(self):
+        cache = ResponseCache(normalize=True)
+        cache.put('gemma3:4b', self.messages, None, self.result)
+        self.assertIsNotNone(cache.get('gemma3:4b', [{'role': 'user', 'content': ' who IS bach? '}]))
+
+    def test_ttl_and_lru_eviction(self):
+        cache = ResponseCache(ttl=60, max_entries=2)
+        for prompt in ('a', 'b'):
+            cache.put('m', [{'role': 'user', 'content': prompt}], None, self.result)
+        cache.get('m', [{'role': 'user', 'content': 'a'}])
+        cache.put('m', [{'role': 'user', 'content': 'c'}], None, self.result)
+        self.assertIsNone(cache.get('m', [{'role': 'user', 'content': 'b'}]))
+        self.assertIsNotNone(cache.get('m', [{'role': 'user', 'content': 'a'}]))
+        self.assertEqual(cache.stats()['evictions'], 1)
+        key = cache.key('m', [{'role': 'user', 'content': 'a'}])
+        cache.entries[key] = (time.time() - 61, cache.entries[key][1])
+        self.assertIsNone(cache.get('m', [{'role': 'user', 'content': 'a'}]))
+        self.assertEqual(cache.stats()['expired'], 1)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "cache.json")
+            cache = ResponseCache(path)
+            cache.put('gemma3:4b', self.messages, None, self.result)
+            cache.save()
+            loaded = ResponseCache(path)
+            loaded.load()
+            self.assertEqual(loaded.get('gemma3:4b', self.messages)['message']['content'], 'A composer.')
+            with open(path, 'w') as f:
+                f.write('[]')
+            with self.assertRaises(ValueError):
+                loaded.load()
+
+if __name__ == '__main__':
+    unittest.main()
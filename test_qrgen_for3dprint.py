@@ -0,0 +1,303 @@
+import unittest
+import io
+import os
+import re
+import json
+import math
+import struct
+import tempfile
+import zipfile
+import importlib.util
+import contextlib
+import sys
+from unittest import mock
+import xml.etree.ElementTree as ET
+import numpy as np
+from qrgen_for3dprint import (make_qr_matrix, merge_modules, label_regions, trace_module_outlines, split_tiles,
+                              outline_path_data, build_qr_mesh, build_cylinder_base_mesh, merge_meshes,
+                              write_binary_stl, write_3mf, generate_mesh, generate_fusion360_svg,
+                              generate_fusion360_step, fit_to_cylinder, format_output_name, generate_batch, serve, main)
+
+URL = "https://example.com/qr"
+HAS_CADQUERY = importlib.util.find_spec('cadquery') is not None
+
+def mesh_volume(vertices, triangles):
+    """Signed volume of a closed triangle mesh (positive when wound counterclockwise seen from outside)."""
+    corners = vertices[triangles]
+    return np.einsum('ij,ij->i', corners[:, 0], np.cross(corners[:, 1], corners[:, 2])).sum() / 6
+
+def assert_closed_manifold(test, triangles):
+    """Every edge is shared by exactly two triangles that traverse it in opposite directions."""
+    edges = np.concatenate([triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]])
+    directed = {tuple(edge) for edge in edges.tolist()}
+    test.assertEqual(len(directed), len(edges), "an edge is traversed twice in the same direction")
+    test.assertEqual(directed, {(b, a) for a, b in directed}, "an edge has no opposite neighbour")
+    test.assertFalse((triangles[:, 0] == triangles[:, 1]).any() or (triangles[:, 1] == triangles[:, 2]).any()
+                     or (triangles[:, 0] == triangles[:, 2]).any(), "degenerate triangle")
+
+def polygon_area(segments, radius):
+    return segments * radius ** 2 * math.sin(2 * math.pi / segments) / 2
+
+def read_binary_stl(path):
+    with open(path, 'rb') as f:
+        f.read(80)
+        (count,) = struct.unpack('<I', f.read(4))
+        records = np.frombuffer(f.read(), dtype=[('normal', '<f4', 3), ('corners', '<f4', (3, 3)), ('attributes', '<u2')])
+    return count, records
+
+def read_3mf(path):
+    """Return (name, vertices, triangles) per object of a 3MF package, and the number of build items."""
+    ns = '{http://schemas.microsoft.com/3dmanufacturing/core/2015/02}'
+    with zipfile.ZipFile(path) as package:
+        if '[Content_Types].xml' not in package.namelist() or '_rels/.rels' not in package.namelist():
+            raise ValueError("incomplete 3MF package")
+        root = ET.fromstring(package.read('3D/3dmodel.model'))
+    objects = []
+    for obj in root.iter(f"{ns}object"):
+        vertices = np.array([[float(v.get(axis)) for axis in 'xyz'] for v in obj.iter(f"{ns}vertex")])
+        triangles = np.array([[int(t.get(key)) for key in ('v1', 'v2', 'v3')] for t in obj.iter(f"{ns}triangle")])
+        objects.append((obj.get('name'), vertices, triangles))
+    return objects, len(list(root.iter(f"{ns}item")))
+
+class TestQRMatrixLayouts(unittest.TestCase):
+    def setUp(self):
+        self.matrix = make_qr_matrix(URL)
+        self.dark = sum(map(sum, self.matrix))
+
+    def test_merge_modes_cover_exactly_the_dark_modules(self):
+        counts = {}
+        for mode in ('none', 'rows', 'rectangles'):
+            covered = np.zeros((len(self.matrix),) * 2, dtype=int)
+            rectangles = merge_modules(self.matrix, mode)
+            for x, y, w, h in rectangles:
+                covered[y:y + h, x:x + w] += 1
+            np.testing.assert_array_equal(covered, np.array(self.matrix, dtype=int), mode)
+            counts[mode] = len(rectangles)
+        self.assertEqual(counts['none'], self.dark)
+        self.assertLess(counts['rectangles'], counts['rows'])
+        self.assertLess(counts['rows'], counts['none'])
+        with self.assertRaises(ValueError):
+            merge_modules(self.matrix, 'diagonal')
+
+    def test_outlines_enclose_the_dark_area(self):
+        def area(loop):
+            return sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(loop, loop[1:] + loop[:1])) / 2
+
+        regions = trace_module_outlines(self.matrix)
+        self.assertEqual(len(regions), len(set(label_regions(self.matrix).values())))
+        self.assertEqual(sum(abs(area(outer)) - sum(abs(area(hole)) for hole in holes) for outer, holes in regions),
+                         self.dark)
+        # Finder patterns are rings: three regions with a hole
+        self.assertGreaterEqual(sum(1 for _, holes in regions if holes), 3)
+        subpaths = outline_path_data(self.matrix, 10).count('M')
+        self.assertEqual(subpaths, sum(1 + len(holes) for _, holes in regions))
+
+    def test_tiles_partition_the_matrix(self):
+        tiles = split_tiles(self.matrix, 3)
+        total = np.sum([np.array(tile, dtype=int) for tile in tiles], axis=0)
+        np.testing.assert_array_equal(total, np.array(self.matrix, dtype=int))
+
+    def test_compact_svg_layouts(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            sizes = {}
+            for mode in ('modules', 'rects', 'path'):
+                output = generate_fusion360_svg(URL, os.path.join(tmp_dir, f"{mode}.svg"), mode=mode)
+                sizes[mode] = os.path.getsize(output)
+                ET.parse(output)
+                if mode == 'rects':
+                    with open(output, encoding='utf-8') as f:
+                        area = 0
+                        for points in re.findall(r'points="([^"]+)"', f.read()):
+                            (x0, y0), _, (x1, y1) = [map(float, p.split(',')) for p in points.split()[:3]]
+                            area += (x1 - x0) * (y1 - y0)
+                    self.assertEqual(area, self.dark * 100)
+        self.assertLess(sizes['path'], sizes['rects'])
+        self.assertLess(sizes['rects'], sizes['modules'])
+
+class TestMeshExport(unittest.TestCase):
+    def setUp(self):
+        self.matrix = make_qr_matrix(URL)
+        self.dark = sum(map(sum, self.matrix))
+
+    def test_qr_mesh_is_closed_and_has_module_volume(self):
+        vertices, triangles = build_qr_mesh(self.matrix, 2.0, 1.5, -10.0, 5.0, 3.0)
+        assert_closed_manifold(self, triangles)
+        self.assertAlmostEqual(mesh_volume(vertices, triangles), self.dark * 2.0 * 2.0 * 1.5, places=6)
+        self.assertEqual((vertices[:, 2].min(), vertices[:, 2].max()), (3.0, 4.5))
+
+    def test_diagonal_contact_stays_manifold(self):
+        vertices, triangles = build_qr_mesh([[True, False], [False, True]], 1.0, 1.0)
+        assert_closed_manifold(self, triangles)
+        self.assertEqual(len(vertices), 16)
+        self.assertAlmostEqual(mesh_volume(vertices, triangles), 2.0)
+
+    def test_cylinder_base_mesh(self):
+        vertices, triangles = build_cylinder_base_mesh(60.0, 3.0, segments=64)
+        assert_closed_manifold(self, triangles)
+        expected = polygon_area(64, 30.0) * 4.0 - polygon_area(64, 29.0) * 1.0
+        self.assertAlmostEqual(mesh_volume(vertices, triangles), expected, places=6)
+
+    def test_stl_round_trip(self):
+        base = build_cylinder_base_mesh(60.0, 3.0, segments=32)
+        qr_layer = build_qr_mesh(self.matrix, 1.0, 1.0, -10.0, -10.0, 3.0)
+        vertices, triangles = merge_meshes([base, qr_layer])
+        self.assertEqual(len(triangles), len(base[1]) + len(qr_layer[1]))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "qr.stl")
+            write_binary_stl(path, vertices, triangles)
+            self.assertEqual(os.path.getsize(path), 84 + 50 * len(triangles))
+            count, records = read_binary_stl(path)
+        self.assertEqual(count, len(records))
+        corners = records['corners'].astype(np.float64)
+        volume = np.einsum('ij,ij->i', corners[:, 0], np.cross(corners[:, 1], corners[:, 2])).sum() / 6
+        self.assertAlmostEqual(volume, mesh_volume(vertices, triangles), places=2)
+        # Stored normals point the way the winding does
+        winding = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        self.assertTrue((np.einsum('ij,ij->i', winding, records['normal']) > 0).all())
+
+    def test_3mf_round_trip(self):
+        vertices, triangles = build_qr_mesh(self.matrix, 0.5, 1.0, -3.25, 2.0, 3.0)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "qr.3mf")
+            write_3mf(path, [('QR "code" & <base>', vertices, triangles), ("Empty", vertices[:0], triangles[:0])])
+            objects, items = read_3mf(path)
+        self.assertEqual(items, 2)
+        self.assertEqual([name for name, _, _ in objects], ['QR "code" & <base>', "Empty"])
+        np.testing.assert_array_equal(objects[0][1], vertices)
+        np.testing.assert_array_equal(objects[0][2], triangles)
+        self.assertEqual(objects[1][1].size, 0)
+
+    def test_split_3mf_has_two_closed_objects(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = generate_mesh(URL, os.path.join(tmp_dir, "qr.3mf"), box_size=1.0, cylinder=True, segments=48,
+                                 split=True)
+            objects, items = read_3mf(path)
+        self.assertEqual([name for name, _, _ in objects], ['Base', 'QR code'])
+        self.assertEqual(items, 2)
+        volumes = []
+        for _, vertices, triangles in objects:
+            assert_closed_manifold(self, triangles)
+            volumes.append(mesh_volume(vertices, triangles))
+        diameter = len(self.matrix) + 10.0
+        base_volume = polygon_area(48, diameter / 2) * 4.0 - polygon_area(48, diameter / 2 - 1) * 1.0
+        self.assertAlmostEqual(volumes[0], base_volume, delta=base_volume * 1e-5)
+        self.assertAlmostEqual(volumes[1], self.dark, delta=self.dark * 1e-5)
+
+    def test_invalid_mesh_requests(self):
+        with self.assertRaises(ValueError):
+            generate_mesh(URL, "qr.obj")
+        with self.assertRaises(ValueError):
+            generate_mesh(URL, "qr.3mf", split=True)
+        with self.assertRaises(ValueError):
+            generate_mesh(URL, "qr.stl", cylinder=True, split=True)
+
+class TestBatchAndDaemon(unittest.TestCase):
+    def test_format_output_name(self):
+        self.assertEqual(format_output_name("qr_{index:03d}_{host}.svg", 7, "https://www.example.com/a/b"),
+                         "qr_007_example.com.svg")
+        self.assertEqual(format_output_name("{slug}.svg", 1, "example.com/a b?q=1"), "example_com_a_b.svg")
+
+    def test_batch_creates_then_skips(self):
+        urls = ["https://example.com/1", "https://example.com/2"]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            template = os.path.join(tmp_dir, "qr_{index:02d}.stl")
+            first = generate_batch(urls, template, kind='mesh', workers=1)
+            second = generate_batch(urls, template, kind='mesh', workers=1)
+            self.assertEqual([status for _, _, status in first], ['created'] * 2)
+            self.assertEqual([status for _, _, status in second], ['skipped'] * 2)
+            self.assertEqual(sorted(os.listdir(tmp_dir)), ["qr_01.stl", "qr_02.stl"])
+            with self.assertRaises(ValueError):
+                generate_batch(urls, os.path.join(tmp_dir, "same.svg"))
+
+    def test_batch_split_mesh_defaults_to_3mf(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            url_file = os.path.join(tmp_dir, "urls.txt")
+            with open(url_file, 'w') as f:
+                f.write("https://example.com/1\n")
+            argv = ['qrgen_for3dprint.py', '--batch', url_file, '--mesh', '--cylinder', '--split', '--workers', '1']
+            cwd = os.getcwd()
+            os.chdir(tmp_dir)
+            try:
+                with mock.patch.object(sys, 'argv', argv), contextlib.redirect_stdout(io.StringIO()):
+                    main()
+                self.assertEqual(sorted(os.listdir(tmp_dir)), ["qr_001_example.com.3mf", "urls.txt"])
+                argv += ['--output-template', "qr_{index}.stl"]
+                with mock.patch.object(sys, 'argv', argv), contextlib.redirect_stderr(io.StringIO()):
+                    with self.assertRaises(SystemExit):
+                        main()
+            finally:
+                os.chdir(cwd)
+
+    def test_serve_replies_per_request(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, "qr.svg")
+            requests = io.StringIO(json.dumps({'id': 1, 'url': URL, 'output': output}) + "\n"
+                                   + json.dumps({'id': 2, 'url': URL, 'output': "qr.txt"}) + "\n")
+            replies = io.StringIO()
+            serve(requests, replies, preload=('qrcode',))
+            ready, first, second = [json.loads(line) for line in replies.getvalue().splitlines()]
+            self.assertTrue(ready['ready'])
+            self.assertEqual((first['id'], first['ok'], second['id'], second['ok']), (1, True, 2, False))
+            self.assertTrue(os.path.exists(output))
+
+@unittest.skipUnless(HAS_CADQUERY, "cadquery is not installed")
+class TestStepExport(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.matrix = make_qr_matrix(URL)
+        cls.dark = sum(map(sum, cls.matrix))
+        cls.tmp = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def import_step(self, path):
+        import cadquery as cq
+        shape = cq.importers.importStep(path).val()
+        self.assertTrue(shape.isValid())
+        return shape
+
+    def test_qr_layer_modes_have_module_volume(self):
+        from qrgen_for3dprint import build_qr_solid, build_qr_solid_tiled, build_qr_outline_solid
+        expected = self.dark * 2.0 * 2.0 * 1.0
+        solids = {
+            'none': build_qr_solid(self.matrix, 2.0, 1.0, merge='none'),
+            'rectangles': build_qr_solid(self.matrix, 2.0, 1.0),
+            'tiled': build_qr_solid_tiled(self.matrix, 2.0, 1.0, tiles=2, workers=1),
+            'outline': build_qr_outline_solid(self.matrix, 2.0, 1.0),
+        }
+        for name, solid in solids.items():
+            shape = solid.val()
+            self.assertTrue(shape.isValid(), name)
+            self.assertAlmostEqual(shape.Volume(), expected, delta=expected * 1e-6, msg=name)
+
+    def test_cylinder_union_is_one_valid_solid(self):
+        diameter = 50.0
+        _, box_size = fit_to_cylinder(len(self.matrix), 10, cylinder_diameter=diameter)
+        base_volume = math.pi * (diameter / 2) ** 2 * 3.0 + math.pi * ((diameter / 2) ** 2 - (diameter / 2 - 1) ** 2)
+        expected = base_volume + self.dark * box_size ** 2 * 1.0
+        for outline in (False, True):
+            path = os.path.join(self.tmp.name, f"cyl_{outline}.step")
+            generate_fusion360_step(URL, path, cylinder=True, cylinder_diameter=diameter, outline=outline)
+            shape = self.import_step(path)
+            self.assertEqual(len(shape.Solids()), 1)
+            self.assertAlmostEqual(shape.Volume(), expected, delta=expected * 1e-4)
+
+    def test_split_step_keeps_base_and_qr_code_apart(self):
+        path = os.path.join(self.tmp.name, "split.step")
+        generate_fusion360_step(URL, path, box_size=1.0, cylinder=True, split=True)
+        shape = self.import_step(path)
+        # The base plus one solid per separate QR region, none of them unioned with the base
+        volumes = sorted((solid.Volume() for solid in shape.Solids()), reverse=True)
+        diameter = len(self.matrix) + 10.0
+        base_volume = math.pi * (diameter / 2) ** 2 * 3.0 + math.pi * ((diameter / 2) ** 2 - (diameter / 2 - 1) ** 2)
+        self.assertAlmostEqual(volumes[0], base_volume, delta=base_volume * 1e-6)
+        self.assertAlmostEqual(sum(volumes[1:]), self.dark, delta=self.dark * 1e-6)
+        with open(path, encoding='utf-8', errors='replace') as f:
+            content = f.read()
+        self.assertIn("'base'", content)
+        self.assertIn("'qr_code'", content)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+import unittest
+import io
+import os
+import socket
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from contextlib import redirect_stdout
+from url_list import (URLLinkedList, URLArrayList, URLHostIndex, BloomFilter, validate_urls, validate_lines,
+                      normalize_url, stream_unique_urls, run_checks)
+
+class TestURLStorage(unittest.TestCase):
+    def setUp(self):
+        self.urls = ["https://www.google.com", "http://localhost:8080", "https://例え.jp/パス"]
+
+    def test_linked_list_append_keeps_order(self):
+        url_list = URLLinkedList()
+        for url in self.urls:
+            url_list.append(url)
+        self.assertEqual(list(url_list), self.urls)
+        self.assertEqual(url_list.size, 3)
+        self.assertEqual(url_list.tail.url, self.urls[-1])
+
+    def test_array_list_matches_linked_list(self):
+        linked, compact = URLLinkedList(), URLArrayList()
+        for url in self.urls:
+            linked.append(url)
+            compact.append(url)
+        self.assertEqual(list(compact), list(linked))
+        self.assertEqual(compact.size, linked.size)
+        self.assertEqual(compact[2], self.urls[2])
+        self.assertEqual(compact[-1], self.urls[-1])
+        with self.assertRaises(IndexError):
+            compact[3]
+
+    def test_print_list(self):
+        for storage in (URLLinkedList, URLArrayList):
+            url_list = storage()
+            output = io.StringIO()
+            with redirect_stdout(output):
+                url_list.print_list()
+                url_list.append(self.urls[0])
+                url_list.print_list()
+            self.assertEqual(output.getvalue(), f"The list is empty.\n1. {self.urls[0]}\n")
+
+class TestURLValidation(unittest.TestCase):
+    def test_validate_urls_partitions_with_reasons(self):
+        urls = ["https://www.google.com", "ftp://example.com", "http://-bad.com", "http://localhost:80x",
+                "HTTP://EXAMPLE.COM/a b", "http://127.0.0.1:8080/path?q=1", "", "a\nhttps://x.com"]
+        valid, invalid = validate_urls(urls)
+        self.assertEqual(valid, ["https://www.google.com", "http://127.0.0.1:8080/path?q=1"])
+        self.assertEqual(invalid, [("ftp://example.com", "scheme"), ("http://-bad.com", "host"),
+                                   ("http://localhost:80x", "port"), ("HTTP://EXAMPLE.COM/a b", "path"),
+                                   ("", "empty"), ("a\nhttps://x.com", "whitespace")])
+
+    def test_batch_matches_per_url_validation(self):
+        checker = URLLinkedList()
+        urls = [f"https://host{i}.example.com/{i}" if i % 3 else f"host{i}" for i in range(100)]
+        valid, invalid = validate_urls(urls)
+        self.assertEqual(valid, [url for url in urls if checker.validate_url(url)])
+        self.assertEqual([url for url, _ in invalid], [url for url in urls if not checker.validate_url(url)])
+
+    def test_validate_lines_chunks_in_order(self):
+        lines = [f"https://host{i}.example.com/\n" if i % 4 else "not a url\n" for i in range(50)] + ["\n"]
+        self.assertEqual(validate_lines(lines, chunk_size=7), validate_urls([line.strip() for line in lines[:-1]]))
+
+class TestURLStreaming(unittest.TestCase):
+    def test_normalize_url(self):
+        self.assertEqual(normalize_url("HTTPS://Example.COM:443/a/"), "https://example.com/a")
+        self.assertEqual(normalize_url("http://example.com:80"), "http://example.com/")
+        self.assertEqual(normalize_url("http://LOCALHOST:8080?q=A/"), "http://localhost:8080/?q=A/")
+        self.assertEqual(normalize_url("https://example.com:80/Path//"), "https://example.com:80/Path")
+
+    def test_stream_unique_urls(self):
+        lines = ["HTTPS://Example.COM:443/a/\n", "https://example.com/a\n", "\n", "bad\n",
+                 "http://example.com\n", "http://EXAMPLE.com/\n"]
+        for bloom in (None, BloomFilter(100)):
+            stats = {}
+            urls = list(stream_unique_urls(iter(lines), bloom, stats))
+            self.assertEqual(urls, ["https://example.com/a", "http://example.com/"])
+            self.assertEqual(stats, {'lines': 5, 'valid': 4, 'invalid': 1, 'duplicates': 2})
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(1000, 0.01)
+        self.assertTrue(bloom.add("https://example.com/"))
+        self.assertFalse(bloom.add("https://example.com/"))
+        self.assertIn("https://example.com/", bloom)
+        with self.assertRaises(ValueError):
+            BloomFilter(0)
+
+class TestURLHostIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = URLHostIndex.from_lines([
+            "https://example.com/blog/2\n", "https://Example.com/blog/1/\n", "http://example.com/about\n",
+            "https://example.com:443/blogger\n", "https://example.com/blog/1\n", "http://localhost:8080/x\n",
+            "not a url\n"])
+
+    def test_host_queries(self):
+        self.assertEqual(self.index.urls_for_host("EXAMPLE.com"),
+                         ["http://example.com/about", "https://example.com/blog/1",
+                          "https://example.com/blog/2", "https://example.com/blogger"])
+        self.assertEqual(self.index.host_counts(), {"example.com": 4, "localhost:8080": 1})
+        self.assertEqual(self.index.count("nowhere.com"), 0)
+        self.assertEqual(len(self.index), 5)
+        self.assertIn("HTTPS://example.com/blog/2/", self.index)
+        self.assertNotIn("https://example.com/blog", self.index)
+
+    def test_prefix_queries(self):
+        self.assertEqual(self.index.urls_with_prefix("https://example.com/blog/"),
+                         ["https://example.com/blog/1", "https://example.com/blog/2"])
+        self.assertEqual(len(self.index.urls_with_prefix("example.com/")), 4)
+        self.assertEqual(self.index.urls_with_prefix("http://localhost:8080"), ["http://localhost:8080/x"])
+        self.assertEqual(self.index.urls_with_prefix("ftp://example.com/"), [])
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "index.json.gz")
+            self.index.add("https://new.example.org/")
+            self.index.save(path)
+            loaded = URLHostIndex.load(path)
+            self.assertEqual(loaded.host_counts(), self.index.host_counts())
+            self.assertEqual(loaded.urls_with_prefix("example.com/b"), self.index.urls_with_prefix("example.com/b"))
+            with open(path, 'w') as f:
+                f.write("https://example.com/\n")
+            with self.assertRaises(OSError):
+                URLHostIndex.load(path)
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers HEAD /ok with 200, /slow after 0.1 s, /hang after 2 s and anything else with 404."""
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def do_HEAD(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            if self.path.startswith('/slow'):
+                time.sleep(0.1)
+            elif self.path == '/hang':
+                time.sleep(2)
+            self.send_response(200 if self.path != '/missing' else 404)
+            self.end_headers()
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+class TestURLCheck(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        cls.server.daemon_threads = True
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_status_and_latency_in_input_order(self):
+        urls = [f"{self.base}/ok", f"{self.base}/missing", f"{self.base}/slow?q=1"]
+        results = run_checks(urls, timeout=2)
+        self.assertEqual([result.url for result in results], urls)
+        self.assertEqual([result.status for result in results], [200, 404, 200])
+        self.assertGreaterEqual(results[2].latency_ms, 100)
+        self.assertIsNone(results[0].error)
+
+    def test_timeout_and_connection_errors(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            closed_port = sock.getsockname()[1]
+        results = run_checks([f"{self.base}/hang", f"http://127.0.0.1:{closed_port}/"], timeout=0.3)
+        self.assertEqual([result.status for result in results], [None, None])
+        self.assertIn("timeout", results[0].error)
+        self.assertLess(results[0].latency_ms, 1500)
+        self.assertTrue(results[1].error)
+
+    def test_per_host_limit(self):
+        StubHandler.max_active = 0
+        start = time.perf_counter()
+        results = run_checks([f"{self.base}/slow/{i}" for i in range(8)], concurrency=8, per_host=2)
+        self.assertTrue(all(result.status == 200 for result in results))
+        self.assertLessEqual(StubHandler.max_active, 2)
+        # 8 requests of 0.1 s, 2 at a time
+        self.assertGreaterEqual(time.perf_counter() - start, 0.4)
+
+if __name__ == '__main__':
+    unittest.main()